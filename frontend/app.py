@@ -6,22 +6,40 @@ Sleek black and red design matching splash page aesthetic
 
 import streamlit as st
 import asyncio
+import atexit
+import queue
+import re
+import threading
 import time
 import base64
+import heapq
+import html
 from pathlib import Path
 import os
 import sys
 from dotenv import load_dotenv
 
+@st.cache_resource(show_spinner=False)
+def _load_env():
+    """Load .env once per process; load_dotenv never overrides variables already set."""
+    load_dotenv()
+
+
 # Load environment variables
-load_dotenv()
+_load_env()
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
-# Add parent directory to path for imports
-sys.path.append(str(Path(__file__).parent.parent))
+# Add parent directory to path for imports; the script body runs on every rerun,
+# so only insert it once
+if str(_PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(_PROJECT_ROOT))
 
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from langchain_anthropic import ChatAnthropic
-from langchain_core.messages import HumanMessage, ToolMessage
+# langchain imports are deferred to first use so the splash page renders without
+# paying for langchain-core on a cold start; these modules don't import it
+from langchain_integration.resilience import get_bulkhead, preregister
+from langchain_integration.tool_cache import ToolResultCache
+from langchain_integration.tool_messages import tool_message_content
 
 # Try to import observability
 try:
@@ -40,32 +58,17 @@ st.set_page_config(
 )
 
 
-def get_base64_image(image_path: str):
-    """Convert image to base64 for CSS background."""
-    try:
-        with open(image_path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode()
-    except Exception:
-        return None
+def _minify_css(css: str) -> str:
+    """Strip comments and redundant whitespace from an inline <style> block."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    # Only around characters where whitespace is never significant; a space
+    # before ':' can be a descendant combinator (e.g. ".a :not(.b)")
+    return re.sub(r"\s*([{};,])\s*", r"\1", css).strip()
 
 
 # -------------------- Splash Page Styles --------------------
-def inject_splash_css(bg_image_base64: str | None = None):
-    """Inject CSS for sleek, minimal splash page."""
-    if bg_image_base64:
-        background = f"""
-            background: linear-gradient(rgba(0,0,0,0.40), rgba(0,0,0,0.60)),
-                        url(data:image/png;base64,{bg_image_base64});
-            background-size: cover;
-            background-position: center;
-            background-attachment: fixed;
-        """
-    else:
-        background = """
-            background: linear-gradient(135deg, #0A0E27 0%, #1A1F3A 100%);
-        """
-
-    css = """
+_SPLASH_CSS_TEMPLATE = """
     <style>
         /* Hide Streamlit chrome on splash */
         [data-testid="stHeader"],
@@ -120,11 +123,11 @@ def inject_splash_css(bg_image_base64: str | None = None):
             border: none !important;
             border-radius: 50px !important;
             cursor: pointer !important;
-            transition: all 0.3s ease !important;
+            transition: transform 0.3s ease, box-shadow 0.3s ease !important;
             box-shadow: 0 8px 25px rgba(255,59,59,0.4) !important;
             text-transform: uppercase !important;
             letter-spacing: 2px !important;
-            animation: fadeInUp 1.5s ease-out, pulse 2s ease-in-out 2s infinite !important;
+            animation: fadeInUp 1.5s ease-out, pulse 2s ease-in-out 2s 3 !important;
             white-space: nowrap !important;
         }
         .st-key-start_btn [data-testid="stButton"] > button:hover {
@@ -141,18 +144,81 @@ def inject_splash_css(bg_image_base64: str | None = None):
             50%      { box-shadow: 0 8px 35px rgba(255, 59, 59, 0.7); }
         }
     </style>
-    """.replace("%BACKGROUND%", background)
+    """
+
+
+# The script body re-runs on every interaction, so minifying at module level
+# would redo the regex passes each rerun; cache_resource builds once per process
+@st.cache_resource(show_spinner=False)
+def _splash_css_parts() -> tuple:
+    """Minified splash CSS, split around the background declaration."""
+    return tuple(_minify_css(_SPLASH_CSS_TEMPLATE).split("%BACKGROUND%"))
+
 
-    st.markdown(css, unsafe_allow_html=True)
+@st.cache_resource(show_spinner=False)
+def _splash_css(background: str) -> str:
+    """Full splash stylesheet for a given background declaration."""
+    head, tail = _splash_css_parts()
+    return head + background + tail
+
+
+_SPLASH_BG_GRADIENT = """
+            background: linear-gradient(135deg, #0A0E27 0%, #1A1F3A 100%);
+        """
+
+
+def _splash_background(image_url: str) -> str:
+    return f"""
+            background: linear-gradient(rgba(0,0,0,0.40), rgba(0,0,0,0.60)),
+                        url({image_url});
+            background-size: cover;
+            background-position: center;
+            background-attachment: fixed;
+        """
+
+
+# Served by Streamlit from frontend/static/ (server.enableStaticServing), so the
+# browser fetches and caches the WebP instead of receiving it inlined as base64
+_SPLASH_BG_PATH = Path(__file__).parent / "static" / "splash_bg.webp"
+_SPLASH_BG_URL = "app/static/splash_bg.webp"
+
+
+# cache_resource hands back the same string object, so reruns don't re-encode
+# the image; ``mtime`` keys it to the file version
+@st.cache_resource(show_spinner=False)
+def _splash_css_inline_bg(image_path: str, mtime: float) -> str:
+    """Build the splash CSS with the background image inlined as base64."""
+    with open(image_path, "rb") as img_file:
+        bg_image_base64 = base64.b64encode(img_file.read()).decode()
+    background = _splash_background(f"data:image/webp;base64,{bg_image_base64}")
+    head, tail = _splash_css_parts()
+    return head + background + tail
+
+
+def inject_splash_css():
+    """Inject CSS for sleek, minimal splash page."""
+    if st.get_option("server.enableStaticServing"):
+        css = _splash_css(_splash_background(f"'{_SPLASH_BG_URL}'"))
+    else:
+        # Static serving turned off (e.g. via CLI flag): fall back to the inlined image
+        if _SPLASH_BG_PATH.exists():
+            css = _splash_css_inline_bg(str(_SPLASH_BG_PATH), _SPLASH_BG_PATH.stat().st_mtime)
+        else:
+            css = _splash_css(_SPLASH_BG_GRADIENT)
+    st.html(css)
 
 
 def show_splash_page():
     """Display the simplified splash/landing page."""
-    bg_image_path = "frontend/assets/splash_bg.png"
-    bg_image_base64 = get_base64_image(bg_image_path)
-    inject_splash_css(bg_image_base64)
+    inject_splash_css()
+
+    # Boot the MCP servers while the user is looking at the splash page, so the
+    # cached initialize_platform() is usually ready by the time they click through
+    if not st.session_state.get("_platform_warmup_started"):
+        st.session_state["_platform_warmup_started"] = True
+        threading.Thread(target=_warm_platform, name="platform-warmup", daemon=True).start()
 
-    st.markdown(
+    st.html(
         """
         <div class="splash-container">
           <div class="splash-content">
@@ -160,8 +226,7 @@ def show_splash_page():
             <div class="splash-tagline">AI-Powered Boxing Intelligence &amp; Analysis Platform</div>
           </div>
         </div>
-        """,
-        unsafe_allow_html=True,
+        """
     )
 
     if st.button("Get in the Ring", key="start_btn", type="primary"):
@@ -170,10 +235,7 @@ def show_splash_page():
 
 
 # -------------------- Main App CSS --------------------
-def inject_main_css():
-    """Inject CSS for main chatbot interface."""
-    st.markdown(
-        """
+_MAIN_CSS_SOURCE = """
         <style>
         /* App backdrop */
         .stApp {
@@ -202,7 +264,7 @@ def inject_main_css():
         .stTextInput > div > div > input {
         background:#2C2D3D !important; color:#FFF !important; border:none !important;
         padding:0.95rem 1.6rem 2rem !important; font-size:1rem !important; line-height:1.5 !important;
-        border-radius:12px !important; transition:all .3s ease !important; font-weight:300 !important; height:56px !important;
+        border-radius:12px !important; transition:background-color .3s ease, box-shadow .3s ease !important; font-weight:300 !important; height:56px !important;
         box-sizing:border-box !important; vertical-align:middle !important;
         }
         .stTextInput > div > div { border-radius:12px !important; border-color:#717395 !important; }
@@ -211,7 +273,8 @@ def inject_main_css():
         .stTextInput > div > div > input::placeholder { color:rgba(255,255,255,.7) !important; font-weight:300 !important; }
 
         /* ANALYZE button */
-        button[data-testid="stBaseButton-primary"]{
+        button[data-testid="stBaseButton-primary"],
+        button[data-testid="stBaseButton-primaryFormSubmit"]{
         background:linear-gradient(135deg,#FF3B3B 0%,#B71C1C 100%) !important;
         color:#fff !important; border:none !important; border-radius:12px !important;
 
@@ -222,10 +285,11 @@ def inject_main_css():
         display:inline-flex !important; align-items:center !important; justify-content:center !important;
         white-space:nowrap !important; word-break:keep-all !important;
 
-        box-sizing:border-box !important; transition:all .3s ease !important;
+        box-sizing:border-box !important; transition:transform .3s ease, box-shadow .3s ease !important;
         box-shadow:0 4px 12px rgba(255,59,59,.35) !important;
         }
-        button[data-testid="stBaseButton-primary"]:hover{
+        button[data-testid="stBaseButton-primary"]:hover,
+        button[data-testid="stBaseButton-primaryFormSubmit"]:hover{
         background:linear-gradient(135deg,#B71C1C 0%,#FF3B3B 100%) !important;
         transform:translateY(-2px) !important; box-shadow:0 6px 20px rgba(255,59,59,.5) !important;
         }
@@ -233,13 +297,21 @@ def inject_main_css():
         /* Messages */
         .chat-message {
         padding:1.75rem; border-radius:16px; margin:1rem auto; max-width:1000px;
-        background:rgba(20,20,25,.98); border:1px solid rgba(60,60,70,.4); backdrop-filter:blur(10px);
+        background:rgba(20,20,25,.98); border:1px solid rgba(60,60,70,.4);
+        contain:layout style;
         }
         .user-message { border-left:3px solid #4A81CC; }
         .assistant-message { border-left:3px solid #B71C1C; }
 
         .message-role { font-weight:600; font-size:.85rem; color:#909099; margin-bottom:.9rem; text-transform:uppercase; letter-spacing:1.2px; }
         .message-content { color:#E8E8ED; line-height:1.8; font-size:1.05rem; font-weight:300; }
+        .message-content > :first-child { margin-top:0; }
+        .message-content > :last-child { margin-bottom:0; }
+        .message-content p, .message-content ul, .message-content ol { margin:0 0 .9rem; }
+        .message-content h1, .message-content h2, .message-content h3 { color:#F2F2F5; font-weight:600; margin:1.2rem 0 .6rem; }
+        .message-content code { background:rgba(255,255,255,.06); border-radius:4px; padding:.1rem .3rem; }
+        .message-content table { border-collapse:collapse; margin:0 0 .9rem; }
+        .message-content th, .message-content td { border:1px solid rgba(60,60,70,.6); padding:.35rem .7rem; }
 
         /* Tool call chips */
         .tool-call {
@@ -254,20 +326,23 @@ def inject_main_css():
         [data-testid="stSidebar"] { background:#000; border-right:1px solid rgba(60,60,70,.3); }
 
         /* Examples left rail */
-        .examples-wrap { background:#20232D; border-radius:14px; padding:12px; height:100%; }
-        .examples-sticky { position:sticky; top:75px; }
+        .st-key-examples { background:#20232D; border-radius:14px; padding:12px; position:sticky; top:75px; }
         .examples-title { color:#9aa7bd; font-weight:700; font-size:.9rem; text-transform:uppercase; letter-spacing:1px; margin:4px 0 10px 2px; }
 
-        .block-container :not([data-testid="stSidebar"]) button[data-testid="stBaseButton-secondary"]{
-        width:100%; text-align:left; background:#2A2E4F !important; color:#4A81CC !important;
+        .st-key-example_pick [data-testid="stButtonGroup"] > div { display:flex; flex-direction:column; gap:.5rem; }
+        .block-container :not([data-testid="stSidebar"]) button[data-testid="stBaseButton-secondary"],
+        .st-key-example_pick button[data-testid^="stBaseButton-pills"]{
+        width:100%; text-align:left; justify-content:flex-start; background:#2A2E4F !important; color:#4A81CC !important;
         border:1px solid rgba(255,255,255,.06) !important; border-radius:12px !important;
         padding:12px !important; box-shadow:none !important; font-weight:500 !important;
         line-height:1.35 !important; white-space:normal !important; word-break:break-word !important; min-height:84px;
         }
-        .block-container :not([data-testid="stSidebar"]) button[data-testid="stBaseButton-secondary"] p{
+        .block-container :not([data-testid="stSidebar"]) button[data-testid="stBaseButton-secondary"] p,
+        .st-key-example_pick button[data-testid^="stBaseButton-pills"] p{
         margin:0 !important; white-space:normal !important; word-break:break-word !important; line-height:1.35 !important;
         }
-        .block-container :not([data-testid="stSidebar"]) button[data-testid="stBaseButton-secondary"]:hover{
+        .block-container :not([data-testid="stSidebar"]) button[data-testid="stBaseButton-secondary"]:hover,
+        .st-key-example_pick button[data-testid^="stBaseButton-pills"]:hover{
         filter:brightness(1.06); transform:translateY(-1px);
         }
 
@@ -322,18 +397,89 @@ def inject_main_css():
             background: transparent !important;
         }
         </style>
-        """,
-        unsafe_allow_html=True,
-    )
+"""
+
+
+@st.cache_resource(show_spinner=False)
+def _main_css() -> str:
+    """Minified main stylesheet, built once per process."""
+    return _minify_css(_MAIN_CSS_SOURCE)
+
+
+def inject_main_css():
+    """Inject CSS for main chatbot interface."""
+    # Must run on every rerun: Streamlit removes elements a run doesn't re-emit, so a
+    # once-per-session guard would drop the styles.
+    st.html(_main_css())
+
+
+# -------------------- Event Loop --------------------
+@st.cache_resource(show_spinner=False)
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Start one long-lived event loop in a daemon thread, shared by all sessions.
+
+    Keeping the loop alive lets the MCP transports and HTTP connection pools
+    created on it survive across queries instead of dying with asyncio.run().
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="boxonomics-loop", daemon=True).start()
+    return loop
+
+
+# Minimum seconds between repaints of streamed text
+RENDER_INTERVAL = 0.05
+
+
+def run_async(coro, updates: queue.SimpleQueue | None = None, render=None):
+    """Run a coroutine on the shared loop and block until it completes.
+
+    Streamlit elements can only be written from the script thread, so progress
+    pushed onto ``updates`` by the coroutine is drained here and handed to
+    ``render`` (coalescing bursts to the latest value).
+    """
+    fut = asyncio.run_coroutine_threadsafe(coro, get_loop())
+    if updates is not None:
+        next_render = 0.0
+        while not fut.done() or not updates.empty():
+            # At most one repaint per RENDER_INTERVAL, however fast tokens arrive
+            delay = next_render - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                latest = updates.get(timeout=RENDER_INTERVAL)
+            except queue.Empty:
+                continue
+            while not updates.empty():
+                latest = updates.get_nowait()
+            render(latest)
+            next_render = time.perf_counter() + RENDER_INTERVAL
+    return fut.result()
 
 
 # -------------------- Platform Init --------------------
-@st.cache_resource
+# MCP server config key -> label shown in the UI
+SERVER_LABELS = {
+    "boxing_analytics": "Analytics",
+    "betting_odds": "Betting",
+    "fight_news": "News",
+    "reddit_social": "Social",
+}
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
 def initialize_platform():
-    """Initialize platform with environment variables passed to subprocesses."""
-    project_root = Path(__file__).parent.parent
-    
-    # Build environment dict to pass to subprocesses
+    """Initialize platform with environment variables passed to subprocesses.
+
+    The returned objects are shared by every session; treat them (tool_map in
+    particular) as read-only.
+    """
+    from langchain_mcp_adapters.client import MultiServerMCPClient
+    from langchain_anthropic import ChatAnthropic
+    from langchain_integration.mcp_sessions import (
+        PersistentSessions, load_tool_specs, save_tool_specs, tool_specs, tool_specs_path,
+    )
+
+    # Environment passed to the MCP server subprocesses
     env_vars = {
         "ANTHROPIC_API_KEY": os.getenv("ANTHROPIC_API_KEY", ""),
         "ODDS_API_KEY": os.getenv("ODDS_API_KEY", ""),
@@ -341,141 +487,336 @@ def initialize_platform():
         "REDDIT_CLIENT_ID": os.getenv("REDDIT_CLIENT_ID", ""),
         "REDDIT_CLIENT_SECRET": os.getenv("REDDIT_CLIENT_SECRET", ""),
         "REDDIT_USER_AGENT": os.getenv("REDDIT_USER_AGENT", "boxonomics/1.0"),
-        "PYTHONPATH": str(project_root),
+        "PYTHONPATH": str(_PROJECT_ROOT),
     }
-    
+
     server_config = {
         "boxing_analytics": {
             "transport": "stdio",
             "command": "python",
-            "args": [str(project_root / "mcp_servers" / "boxing_data.py")],
+            "args": [str(_PROJECT_ROOT / "mcp_servers" / "boxing_data.py")],
             "env": env_vars,  # Pass environment variables
         },
         "betting_odds": {
             "transport": "stdio",
             "command": "python",
-            "args": [str(project_root / "mcp_servers" / "boxing_odds.py")],
+            "args": [str(_PROJECT_ROOT / "mcp_servers" / "boxing_odds.py")],
             "env": env_vars,  # Pass environment variables
         },
         "fight_news": {
             "transport": "stdio",
             "command": "python",
-            "args": [str(project_root / "mcp_servers" / "boxing_news.py")],
+            "args": [str(_PROJECT_ROOT / "mcp_servers" / "boxing_news.py")],
             "env": env_vars,  # Pass environment variables
         },
         "reddit_social": {
             "transport": "stdio",
             "command": "python",
-            "args": [str(project_root / "mcp_servers" / "reddit.py")],
+            "args": [str(_PROJECT_ROOT / "mcp_servers" / "reddit.py")],
             "env": env_vars,  # Pass environment variables
         },
     }
     
     client = MultiServerMCPClient(server_config)
-    
-    async def async_init(): 
-        return await client.get_tools()
-    
-    tools = asyncio.run(async_init())
+    preregister(server_config)
+
+    # Keep one session per server open on the shared loop; tools loaded through
+    # client.get_tools() would spawn a fresh server subprocess on every call.
+    sessions = PersistentSessions(client)
+    server_files = [Path(cfg["args"][0]) for cfg in server_config.values()]
+    specs_path = tool_specs_path(_PROJECT_ROOT / ".cache", server_files)
+    specs = load_tool_specs(specs_path)
+    if specs:
+        # Known tool schemas: the UI is usable now, the servers boot in the background
+        asyncio.run_coroutine_threadsafe(sessions.ensure_started(), get_loop())
+    else:
+        specs = tool_specs(run_async(sessions.start()))
+        save_tool_specs(specs_path, specs)
+    # The tools forward to their server's current session, so a server that
+    # dies is reopened on its next call instead of failing until a restart
+    tools_by_server = sessions.lazy_tools(specs)
+    atexit.register(_close_sessions, sessions, get_loop())
+    tools = [t for server_tools in tools_by_server.values() for t in server_tools]
+
     llm = ChatAnthropic(model="claude-sonnet-4-20250514", temperature=0)
     agent = llm.bind_tools(tools)
     tool_map = {t.name: t for t in tools}
+    # Each tool's owning server (config name) is known here, so server lookups
+    # for bulkheads and UI labels are a dict hit
+    tool_to_server = {
+        t.name: server
+        for server, server_tools in tools_by_server.items()
+        for t in server_tools
+    }
     
-    return agent, tools, tool_map, client
+    return agent, tools, tool_map, tool_to_server, sessions
+
 
+def _close_sessions(sessions, loop: asyncio.AbstractEventLoop):
+    """Shut the MCP sessions down so the server subprocesses exit with the app."""
+    try:
+        asyncio.run_coroutine_threadsafe(sessions.close(), loop).result(timeout=5)
+    except Exception:
+        pass
+
+
+@st.cache_resource(show_spinner=False)
+def get_tool_cache() -> ToolResultCache:
+    """Tool results shared by all sessions; identical calls within a minute reuse them."""
+    return ToolResultCache(ttl=60.0)
+
+
+def _warm_platform():
+    try:
+        initialize_platform()
+    except Exception:
+        # Failures are not cached; show_main_app retries and reports the error
+        pass
 
+
+_SERVERS = [
+    ("Analytics", "Fighter stats & history", "active"),
+    ("Betting", "Odds & value analysis", "active"),
+    ("News", "Media coverage", "active"),
+    ("Social", "Reddit sentiment", "active"),
+]
+
+
+# Static, so the whole panel is built once per process as a single element
+@st.cache_resource(show_spinner=False)
+def _server_status_html() -> str:
+    """Sidebar server panel markup."""
+    return '<div class="section-header">Servers</div>' + "".join(
+        f'''<div class="server-card {status}">
+               <div class="server-name">{name}</div>
+               <div class="server-status">● Online</div>
+               <div style="color:#808090;font-size:.8rem;margin-top:.25rem;">{desc}</div>
+            </div>'''
+        for name, desc, status in _SERVERS
+    )
+
+
+# Sidebar panels are fragments: they write into whatever container they are called
+# in (the sidebar), never via st.sidebar.*, so Streamlit can rerun them on their own.
+@st.fragment
 def display_server_status():
-    st.sidebar.markdown('<div class="section-header">Servers</div>', unsafe_allow_html=True)
-    servers = [
-        ("Analytics", "Fighter stats & history", "active"),
-        ("Betting", "Odds & value analysis", "active"),
-        ("News", "Media coverage", "active"),
-        ("Social", "Reddit sentiment", "active"),
-    ]
-    for name, desc, status in servers:
-        st.sidebar.markdown(
-            f'''<div class="server-card {status}">
-                   <div class="server-name">{name}</div>
-                   <div class="server-status">● Online</div>
-                   <div style="color:#808090;font-size:.8rem;margin-top:.25rem;">{desc}</div>
-                </div>''',
-            unsafe_allow_html=True
-        )
+    st.html(_server_status_html())
 
 
+@st.fragment
 def display_metrics():
     if not OBSERVABILITY_AVAILABLE:
         return
     monitor = get_monitor()
     stats = monitor.get_stats()
-    st.sidebar.markdown('<div class="section-header">Performance</div>', unsafe_allow_html=True)
-    col1, col2 = st.sidebar.columns(2)
-    with col1:
-        st.markdown(
-            f'''<div style="text-align:center;padding:.75rem;background:rgba(20,20,25,.98);border-radius:8px;border:1px solid rgba(60,60,70,.4);">
-                    <div style="font-size:1.5rem;font-weight:700;">{stats['total_queries']}</div>
-                    <div style="font-size:.8rem;">Queries</div>
-                </div>''', unsafe_allow_html=True)
-    with col2:
-        st.markdown(
-            f'''<div style="text-align:center;padding:.75rem;background:rgba(20,20,25,.98);border-radius:8px;border:1px solid rgba(60,60,70,.4);">
-                    <div style="font-size:1.5rem;font-weight:700;">{stats['total_tool_calls']}</div>
-                    <div style="font-size:.8rem;">Tool Calls</div>
-                </div>''', unsafe_allow_html=True)
+    card = (
+        '<div style="text-align:center;padding:.75rem;background:rgba(20,20,25,.98);border-radius:8px;border:1px solid rgba(60,60,70,.4);">'
+        '<div style="font-size:1.5rem;font-weight:700;">{value}</div>'
+        '<div style="font-size:.8rem;">{label}</div>'
+        '</div>'
+    )
+    # Header, both counters and the top-tools list go out as one element
+    parts = [
+        '<div class="section-header">Performance</div>'
+        '<div style="display:grid;grid-template-columns:1fr 1fr;gap:1rem;">',
+        card.format(value=stats['total_queries'], label="Queries"),
+        card.format(value=stats['total_tool_calls'], label="Tool Calls"),
+        '</div>',
+    ]
     if stats['tool_breakdown']:
-        st.sidebar.markdown('<div style="margin-top:1rem;color:#909099;font-size:.85rem;font-weight:600;">Most Used Tools</div>', unsafe_allow_html=True)
-        for tool, metrics in sorted(stats['tool_breakdown'].items(), key=lambda x: x[1]['count'], reverse=True)[:5]:
-            st.sidebar.markdown(f'<div style="color:#707080;font-size:.8rem;margin:.25rem 0;">● {tool}: {metrics["count"]}</div>', unsafe_allow_html=True)
+        top_tools = heapq.nlargest(5, stats['tool_breakdown'].items(), key=lambda x: x[1]['count'])
+        parts.append('<div style="margin-top:1rem;color:#909099;font-size:.85rem;font-weight:600;">Most Used Tools</div>')
+        parts.extend(
+            f'<div style="color:#707080;font-size:.8rem;margin:.25rem 0;">● {tool}: {metrics["count"]}</div>'
+            for tool, metrics in top_tools
+        )
+    st.html("".join(parts))
+
+# Bounds on per-session memory and on what gets re-sent to Claude each turn
+MAX_CHAT_HISTORY = 40
+# Messages rendered eagerly; anything older sits behind a toggle
+RECENT_MESSAGES = 20
+
 
+async def _invoke_tool(tc: dict, tool_map, tool_to_server, tool_cache=None):
+    """Run a single tool call, returning its result and duration in ms."""
+    tool_name = tc["name"]
+    t0 = time.perf_counter_ns()
+    tool = tool_map.get(tool_name)
+    try:
+        if tool is None:
+            result = f"Error: Tool {tool_name} not found"
+        else:
+            async with get_bulkhead(tool_to_server[tool_name]):
+                if tool_cache is not None:
+                    result = await tool_cache.invoke(tool, tc["args"])
+                else:
+                    result = await tool.ainvoke(tc["args"])
+    except Exception as e:
+        # One failing server must not cancel the rest of the batch
+        result = f"Error: Tool {tool_name} failed: {e}"
+    return result, (time.perf_counter_ns() - t0) / 1e6
+
+
+def _message_text(message) -> str:
+    """Extract the text portion of a (possibly block-structured) AI message."""
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") for block in content
+        if isinstance(block, dict) and block.get("type") == "text"
+    )
 
-async def process_query(query: str, agent, tool_map):
-    start_time = time.time()
-    if OBSERVABILITY_AVAILABLE:
-        get_monitor().log_query(query)
+
+async def process_query(query: str, agent, tool_map, tool_to_server, on_text=None, tool_cache=None):
+    """Run the agent loop, streaming partial assistant text to ``on_text``."""
+    from langchain_core.messages import HumanMessage, ToolMessage
+
+    start_time = time.perf_counter_ns()
+    monitor = get_monitor() if OBSERVABILITY_AVAILABLE else None
+    if monitor:
+        monitor.log_query(query)
 
     msgs = [HumanMessage(content=query)]
     tool_calls = []
     iteration, max_iterations = 0, 10
 
-    with st.spinner("Analyzing..."):
-        while iteration < max_iterations:
-            iteration += 1
-            resp = await agent.ainvoke(msgs)
-            msgs.append(resp)
-            if hasattr(resp, "tool_calls") and resp.tool_calls:
-                for tc in resp.tool_calls:
-                    tool_name = tc["name"]
-                    args = tc["args"]
-                    t0 = time.time()
-                    tool = tool_map.get(tool_name)
-                    result = await tool.ainvoke(args) if tool else f"Error: Tool {tool_name} not found"
-                    dt_ms = (time.time() - t0) * 1000
-                    tool_calls.append({
-                        "name": tool_name,
-                        "duration_ms": dt_ms,
-                        "server": get_server_for_tool(tool_name),
-                    })
-                    if OBSERVABILITY_AVAILABLE:
-                        get_monitor().log_tool_call(tool_name, dt_ms)
-                    msgs.append(ToolMessage(content=str(result), tool_call_id=tc["id"]))
-            else:
-                break
-
-    return resp.content, tool_calls, (time.time() - start_time)
+    while iteration < max_iterations:
+        iteration += 1
+        resp = None
+        async for chunk in agent.astream(msgs):
+            # Merging chunks accumulates both text and tool_call fragments
+            resp = chunk if resp is None else resp + chunk
+            if on_text is not None and chunk.content:
+                on_text(_message_text(resp))
+        msgs.append(resp)
+        turn_calls = getattr(resp, "tool_calls", None)
+        if turn_calls:
+            # Tool calls within a turn are independent, so run them concurrently
+            results = await asyncio.gather(
+                *(_invoke_tool(tc, tool_map, tool_to_server, tool_cache) for tc in turn_calls)
+            )
+            # Results come back in call order, keeping tool_call_id pairing intact
+            for tc, (result, dt_ms) in zip(turn_calls, results):
+                tool_name = tc["name"]
+                tool_calls.append({
+                    "name": tool_name,
+                    "duration_ms": dt_ms,
+                    "server": SERVER_LABELS.get(tool_to_server.get(tool_name)) or get_server_for_tool(tool_name),
+                })
+                msgs.append(ToolMessage(content=tool_message_content(result), tool_call_id=tc["id"]))
+            if monitor:
+                monitor.log_tool_calls_batch(
+                    (tc["name"], dt_ms) for tc, (_, dt_ms) in zip(turn_calls, results)
+                )
+        else:
+            break
+
+    return _message_text(resp), tool_calls, (time.perf_counter_ns() - start_time) / 1e9
+
+
+# Checked in order; the first server with a matching keyword wins
+_TOOL_SERVER_RULES = (
+    ("Analytics", ("fighter", "stats", "compare", "career", "upcoming", "trajectory", "opponent", "title")),
+    ("Betting", ("odds", "betting", "value", "predict")),
+    ("News", ("news", "hype", "media", "press")),
+    ("Social", ("reddit", "posts", "buzz", "sentiment", "mentions")),
+)
+
+
+def _server_branch(server: str, keywords: tuple) -> str:
+    # Lookahead so alternation order, not match position, decides the winner;
+    # reddit tools never count as News
+    guard = "(?!.*(?i:reddit))" if server == "News" else ""
+    return f"(?=.*(?:{'|'.join(map(re.escape, keywords))})){guard}(?P<{server}>)"
+
+
+# The script body reruns, so the pattern is compiled once per process here
+@st.cache_resource(show_spinner=False)
+def _tool_server_re() -> re.Pattern:
+    """All of _TOOL_SERVER_RULES as one regex; the named group that matches is the label."""
+    return re.compile("|".join(_server_branch(s, k) for s, k in _TOOL_SERVER_RULES))
 
 
 def get_server_for_tool(tool_name: str) -> str:
-    if any(x in tool_name for x in ['fighter','stats','compare','career','upcoming','trajectory','opponent','title']): return "Analytics"
-    if any(x in tool_name for x in ['odds','betting','value','predict']): return "Betting"
-    if any(x in tool_name for x in ['news','hype','media','press']) and 'reddit' not in tool_name.lower(): return "News"
-    if any(x in tool_name for x in ['reddit','posts','buzz','sentiment','mentions']): return "Social"
-    return "Unknown"
+    """Guess a label from the tool name; only used when tool_to_server has no entry."""
+    m = _tool_server_re().match(tool_name)
+    return m.lastgroup if m else "Unknown"
+
+
+@st.cache_resource(show_spinner=False)
+def get_markdown_renderer():
+    """Markdown parser for assistant replies; raw HTML in the source is escaped."""
+    from markdown_it import MarkdownIt
+    return MarkdownIt("js-default")
+
+
+def _message_html(role: str, content: str) -> str:
+    """Build the chat bubble markup for a single message."""
+    if role == "user":
+        css_class, label = "user-message", "You"
+        body = html.escape(content)
+    else:
+        css_class, label = "assistant-message", "Boxonomics AI"
+        body = get_markdown_renderer().render(content)
+    return f'''<div class="chat-message {css_class}">
+                <div class="message-role">{label}</div>
+                <div class="message-content">{body}</div>
+            </div>'''
+
+
+def _tool_calls_html(tool_calls: list) -> str:
+    return "".join(
+        f'''<div class="tool-call">
+                <span class="tool-server">[{tc["server"]}]</span>
+                <span class="tool-name">{tc["name"]}</span>
+                <span class="tool-duration">({tc["duration_ms"]:.0f}ms)</span>
+            </div>'''
+        for tc in tool_calls
+    )
+
+
+def _chat_entry(role: str, content: str, **fields) -> dict:
+    """Build a chat_history entry with its markup rendered once, up front."""
+    entry = {"role": role, "content": content, **fields}
+    entry["_html"] = _message_html(role, content)
+    if fields.get("tool_calls"):
+        entry["_tools_html"] = _tool_calls_html(fields["tool_calls"])
+    return entry
+
+
+def render_chat_history(messages: list):
+    """Render chat entries; consecutive bubbles go out as one element."""
+    # markup is rendered once when a message is appended (see _chat_entry)
+    pending = []
+    for msg in messages:
+        pending.append(msg["_html"])
+        if not (msg.get("tool_calls") or "duration" in msg):
+            continue
+        st.html("".join(pending))
+        pending = []
+        if msg.get("tool_calls"):
+            with st.expander(f"Tool Usage ({len(msg['tool_calls'])} calls)"):
+                st.html(msg["_tools_html"])
+        if "duration" in msg:
+            st.caption(f"Response time: {msg['duration']:.2f}s")
+    if pending:
+        st.html("".join(pending))
 
 
 # --- Examples helpers ---
-def _set_query_from_example(text: str, input_key: str):
-    # pre-seed the current input widget (created later) before it mounts
-    st.session_state[input_key] = text
+QUERY_INPUT_KEY = "query_input"
+EXAMPLE_PICK_KEY = "example_pick"
+
+
+def _set_query_from_example(input_key: str):
+    # pre-seed the input widget (created later) before it mounts, then clear the
+    # pick so the same example can be chosen again
+    text = st.session_state.get(EXAMPLE_PICK_KEY)
+    if text:
+        st.session_state[input_key] = text
+    st.session_state[EXAMPLE_PICK_KEY] = None
 
 EXAMPLES = [
     "Compare Tyson Fury vs Oleksandr Usyk - who has the advantage?",
@@ -489,14 +830,90 @@ EXAMPLES = [
 ]
 
 def render_example_cards(input_key: str):
-    st.markdown('<div class="examples-wrap examples-sticky">', unsafe_allow_html=True)
-    st.markdown('<div class="examples-title">Examples</div>', unsafe_allow_html=True)
-    for i, q in enumerate(EXAMPLES):
-        st.button(
-            q, key=f"example_{i}", use_container_width=True,
-            on_click=_set_query_from_example, args=(q, input_key)
+    # Markdown divs can't wrap widgets; a keyed container gets the .st-key-examples class
+    with st.container(key="examples"):
+        st.html('<div class="examples-title">Examples</div>')
+        # One widget for all examples rather than a button each
+        st.pills(
+            "Examples", EXAMPLES, key=EXAMPLE_PICK_KEY, label_visibility="collapsed",
+            on_change=_set_query_from_example, args=(input_key,),
         )
-    st.markdown('</div>', unsafe_allow_html=True)
+
+
+# Submitting the form reruns only this fragment, so a query starts streaming
+# without re-executing the hero, sidebar and examples first
+@st.fragment
+def chat_panel(agent, tool_map, tool_to_server):
+    st.markdown('<div class="chat-area">', unsafe_allow_html=True)
+
+    # --- conversation history ---
+    history = st.session_state["chat_history"]
+    if history:
+        st.markdown("---")
+        # Older turns are only built and sent when the user asks for them
+        older, recent = history[:-RECENT_MESSAGES], history[-RECENT_MESSAGES:]
+        if older and st.toggle("Show earlier messages", key="show_earlier"):
+            render_chat_history(older)
+        render_chat_history(recent)
+
+    # --- in-flight turn streams here, where it will land in the history ---
+    live_area = st.container()
+
+    # --- input row under messages ---
+    st.markdown('<div class="chat-input-section">', unsafe_allow_html=True)
+    # A form keeps one stable input widget, submits on Enter, and clears itself
+    with st.form("query_form", clear_on_submit=True, border=False):
+        c1, c2 = st.columns([5, 1.4])
+
+        with c1:
+            query = st.text_input(
+                "Query",
+                placeholder="Ask about fighters, odds, news, or community sentiment...",
+                key=QUERY_INPUT_KEY,
+                label_visibility="collapsed",
+            )
+        with c2:
+            submit = st.form_submit_button("ANALYZE", type="primary")
+
+    if submit:
+        q = query.strip()
+        if q:
+            # append user
+            user_entry = _chat_entry("user", q)
+            st.session_state["chat_history"].append(user_entry)
+            with live_area:
+                st.html(user_entry["_html"])
+                placeholder = st.empty()
+
+            def render_partial(text: str):
+                placeholder.html(_message_html("assistant", text))
+
+            try:
+                updates = queue.SimpleQueue()
+                with st.spinner("Analyzing..."):
+                    response, tool_calls, duration = run_async(
+                        process_query(
+                            q, agent, tool_map, tool_to_server,
+                            on_text=updates.put, tool_cache=get_tool_cache(),
+                        ),
+                        updates=updates,
+                        render=render_partial,
+                    )
+                st.session_state["chat_history"].append(_chat_entry(
+                    "assistant", response, tool_calls=tool_calls, duration=duration,
+                ))
+            except Exception as e:
+                st.error(f"Error: {e}")
+
+            history = st.session_state["chat_history"]
+            if len(history) > MAX_CHAT_HISTORY:
+                st.session_state["chat_history"] = history[-MAX_CHAT_HISTORY:]
+
+        # Full app rerun so the hero, sidebar metrics and history all catch up
+        st.rerun()
+
+    st.markdown("</div>", unsafe_allow_html=True)
+    st.markdown("</div>", unsafe_allow_html=True)
 
 
 # -------------------- Main App --------------------
@@ -508,13 +925,9 @@ def show_main_app():
     if "chat_history" not in st.session_state:
         st.session_state["chat_history"] = []
 
-    # seed to force remount of the input after submit
-    if "input_seed" not in st.session_state:
-        st.session_state["input_seed"] = 0
-    current_key = f"query_input_chat_{st.session_state['input_seed']}"
-
-    display_server_status()
-    display_metrics()
+    with st.sidebar:
+        display_server_status()
+        display_metrics()
 
     st.sidebar.markdown("---")
     if st.sidebar.button("Clear History", use_container_width=True):
@@ -526,120 +939,50 @@ def show_main_app():
     # init platform
     try:
         with st.spinner("Initializing platform..."):
-            agent, tools, tool_map, _client = initialize_platform()
-        st.sidebar.markdown(
-            f'<div style="text-align:center;margin-top:1rem;padding:.5rem;background:rgba(0,208,132,.1);border-radius:8px;color:#00D084;font-size:.85rem;">{len(tools)} tools loaded</div>',
-            unsafe_allow_html=True
+            agent, tools, tool_map, tool_to_server, _sessions = initialize_platform()
+        st.sidebar.html(
+            f'<div style="text-align:center;margin-top:1rem;padding:.5rem;background:rgba(0,208,132,.1);border-radius:8px;color:#00D084;font-size:.85rem;">{len(tools)} tools loaded</div>'
         )
     except Exception as e:
-        st.error(f"Failed to initialize platform: {e}")
-        st.info("Make sure all environment variables are set:\n- ANTHROPIC_API_KEY")
+        st.error(
+            f"Failed to initialize platform: {e}\n\n"
+            "Make sure all environment variables are set:\n- ANTHROPIC_API_KEY"
+        )
         return
 
     show_hero = len(st.session_state["chat_history"]) == 0
     if show_hero:
-        st.markdown('<div class="hero-section">', unsafe_allow_html=True)
-        st.markdown('<h1 class="main-header">BOXONOMICS</h1>', unsafe_allow_html=True)
-        st.markdown('<p class="sub-header">Deploy AI-powered boxing intelligence by chatting with specialized MCP servers</p>', unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+        st.html(
+            '<div class="hero-section">'
+            '<h1 class="main-header">BOXONOMICS</h1>'
+            '<p class="sub-header">Deploy AI-powered boxing intelligence by chatting with specialized MCP servers</p>'
+            '</div>'
+        )
 
     # two-column layout: left examples, right chat
     left, right = st.columns([2, 6], gap="large")
 
     with left:
-        render_example_cards(input_key=current_key)
+        render_example_cards(input_key=QUERY_INPUT_KEY)
 
 
     with right:
-        st.markdown('<div class="chat-area">', unsafe_allow_html=True)
-
-        # --- conversation history ---
-        if st.session_state["chat_history"]:
-            st.markdown("---")
-            for msg in st.session_state["chat_history"]:
-                if msg["role"] == "user":
-                    st.markdown(
-                        f'''<div class="chat-message user-message">
-                                <div class="message-role">You</div>
-                                <div class="message-content">{msg["content"]}</div>
-                            </div>''',
-                        unsafe_allow_html=True,
-                    )
-                else:
-                    st.markdown(
-                        f'''<div class="chat-message assistant-message">
-                                <div class="message-role">Boxonomics AI</div>
-                                <div class="message-content">{msg["content"]}</div>
-                            </div>''',
-                        unsafe_allow_html=True,
-                    )
-                    if msg.get("tool_calls"):
-                        with st.expander(f"Tool Usage ({len(msg['tool_calls'])} calls)"):
-                            for tc in msg["tool_calls"]:
-                                st.markdown(
-                                    f'''<div class="tool-call">
-                                            <span class="tool-server">[{tc["server"]}]</span>
-                                            <span class="tool-name">{tc["name"]}</span>
-                                            <span class="tool-duration">({tc["duration_ms"]:.0f}ms)</span>
-                                        </div>''',
-                                    unsafe_allow_html=True,
-                                )
-                    if "duration" in msg:
-                        st.caption(f"Response time: {msg['duration']:.2f}s")
-
-        # --- input row under messages ---
-        st.markdown('<div class="chat-input-section">', unsafe_allow_html=True)
-        c1, c2 = st.columns([5, 1.4])
-
-        with c1:
-            query = st.text_input(
-                "Query",
-                placeholder="Ask about fighters, odds, news, or community sentiment...",
-                key=current_key,                    # <-- dynamic key mounts a fresh widget each time
-                label_visibility="collapsed",
-            )
-        with c2:
-            submit = st.button("ANALYZE", type="primary")
-
-        if submit:
-            q = st.session_state.get(current_key, "").strip()
-            if q:
-                # append user
-                st.session_state["chat_history"].append({"role": "user", "content": q})
-                try:
-                    response, tool_calls, duration = asyncio.run(
-                        process_query(q, agent, tool_map)
-                    )
-                    st.session_state["chat_history"].append({
-                        "role": "assistant",
-                        "content": response,
-                        "tool_calls": tool_calls,
-                        "duration": duration,
-                    })
-                except Exception as e:
-                    st.error(f"Error: {e}")
-
-            # force the input to remount blank on next run
-            st.session_state["input_seed"] += 1
-            st.rerun()
-
-        st.markdown("</div>", unsafe_allow_html=True)
-        st.markdown("</div>", unsafe_allow_html=True)
+        chat_panel(agent, tool_map, tool_to_server)
 
     if not show_hero:
         st.markdown("---")
-    st.markdown(
+    st.html(
         '''<div class="footer">
             Boxonomics | Powered by LangChain, MCP &amp; Claude Sonnet 4<br>
             4 Specialized Servers | 25+ Intelligence Tools
-        </div>''',
-        unsafe_allow_html=True,
+        </div>'''
     )
 
 
 def main():
     if "show_splash" not in st.session_state:
-        st.session_state["show_splash"] = True
+        # ?skip_splash=1 deep-links straight into the app
+        st.session_state["show_splash"] = not st.query_params.get("skip_splash")
     if st.session_state["show_splash"]:
         show_splash_page()
     else:
@@ -0,0 +1,34 @@
+"""
+Console Module
+
+Terminal input for the asyncio CLIs that doesn't stall the event loop.
+"""
+
+import asyncio
+import threading
+
+
+async def ainput(prompt: str = "") -> str:
+    """
+    input() that keeps the event loop running while the user types.
+
+    The read happens on a daemon thread, so background work (server boot,
+    prefetches) makes progress and an abandoned prompt never blocks exit.
+    """
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future()
+
+    def settle(method, value):
+        if not fut.done():
+            method(value)
+
+    def read():
+        try:
+            line = input(prompt)
+        except BaseException as e:
+            loop.call_soon_threadsafe(settle, fut.set_exception, e)
+        else:
+            loop.call_soon_threadsafe(settle, fut.set_result, line)
+
+    threading.Thread(target=read, name="ainput", daemon=True).start()
+    return await fut
@@ -0,0 +1,203 @@
+"""
+MCP Sessions Module
+
+Keeps one long-lived MCP session open per server so tool calls reuse the running
+stdio subprocess instead of spawning a fresh server for every invocation.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from langchain_core.tools import StructuredTool
+from langchain_mcp_adapters.tools import load_mcp_tools
+
+
+logger = logging.getLogger(__name__)
+
+
+class PersistentSessions:
+    """
+    Long-lived sessions for every server configured on a MultiServerMCPClient.
+
+    Each session is owned by its own task, which enters the session context,
+    loads that server's tools and then waits until close() is called. The
+    context is therefore entered and exited in the same task, as the anyio-based
+    stdio transport requires, while the tools can be invoked from any task on
+    the same event loop.
+
+    A session that ends before close() (say, its server crashed) is dropped, and
+    the next ensure_started() for that server opens a new one.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.tools_by_server: Dict[str, List] = {}
+        self._stop: Optional[asyncio.Event] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._ready: Dict[str, asyncio.Future] = {}
+        self._tool_index: Dict[str, object] = {}
+
+    async def start(self) -> Dict[str, List]:
+        """
+        Open all server sessions concurrently.
+
+        Returns:
+            Mapping of server name to the tools bound to its session
+
+        Raises:
+            Exception: First server startup failure (all sessions are closed)
+        """
+        try:
+            return await self.ensure_started()
+        except Exception:
+            await self.close()
+            raise
+
+    def start_soon(self, *server_names: str) -> Dict[str, asyncio.Future]:
+        """
+        Begin opening the named sessions (default: all) without waiting for them.
+
+        Sessions that are open or opening are left alone; a failed or dead one
+        is opened again.
+
+        Returns:
+            Mapping of server name to a future for its tools
+        """
+        if self._stop is None:
+            self._stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        pending = {}
+        for name in server_names or self.client.connections:
+            ready = self._ready.get(name)
+            if ready is None or (ready.done() and ready.exception() is not None):
+                ready = self._ready[name] = loop.create_future()
+                self._tasks[name] = asyncio.create_task(
+                    self._hold(name, ready), name=f"mcp-session-{name}"
+                )
+            pending[name] = ready
+        return pending
+
+    async def ensure_started(self, *server_names: str) -> Dict[str, List]:
+        """
+        Wait until the named sessions (default: all) are open, opening any that aren't.
+
+        Starts are shared, however many callers are waiting on them.
+
+        Raises:
+            Exception: First server startup failure
+        """
+        pending = self.start_soon(*server_names)
+        # Shielded so a caller giving up doesn't cancel a start others wait on
+        tool_lists = await asyncio.gather(*(asyncio.shield(f) for f in pending.values()))
+        return dict(zip(pending, tool_lists))
+
+    def lazy_tools(self, specs: Dict[str, List[dict]]) -> Dict[str, List]:
+        """
+        Build stand-in tools from tool specs (see tool_specs/load_tool_specs).
+
+        The stand-ins carry the real names, descriptions and argument schemas, so
+        they can be bound to the LLM right away. Each call waits for its server's
+        session, (re)opening it if needed, and forwards to the live tool.
+        """
+        return {
+            server: [self._lazy_tool(server, spec) for spec in server_specs]
+            for server, server_specs in specs.items()
+        }
+
+    def _lazy_tool(self, server_name: str, spec: dict) -> StructuredTool:
+        name = spec["name"]
+
+        async def call(**kwargs):
+            await self.ensure_started(server_name)
+            tool = self._tool_index.get(name)
+            if tool is None:
+                raise ValueError(f"Tool {name} is no longer provided by its server")
+            return await tool.ainvoke(kwargs)
+
+        return StructuredTool(
+            name=name,
+            description=spec["description"],
+            args_schema=spec["args_schema"],
+            coroutine=call,
+        )
+
+    async def _hold(self, server_name: str, ready: asyncio.Future):
+        """Open one session, publish its tools, and keep it open until close()."""
+        stop = self._stop
+        try:
+            async with self.client.session(server_name) as session:
+                tools = await load_mcp_tools(session)
+                self.tools_by_server[server_name] = tools
+                self._tool_index.update((t.name, t) for t in tools)
+                ready.set_result(tools)
+                await stop.wait()
+        except Exception as e:
+            if not ready.done():
+                # Startup failure: raised to whoever is waiting on the start
+                ready.set_exception(e)
+                return
+            if stop.is_set():
+                return
+            logger.warning("MCP session %s ended unexpectedly: %r", server_name, e)
+            # Forget the dead session so the next call to its tools reopens it
+            if self._ready.get(server_name) is ready:
+                del self._ready[server_name]
+                del self._tasks[server_name]
+                for tool in self.tools_by_server.pop(server_name, ()):
+                    self._tool_index.pop(tool.name, None)
+
+    async def close(self):
+        """Close every session and wait for the server subprocesses to exit."""
+        if self._stop is not None:
+            self._stop.set()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._stop = None
+        self._tasks = {}
+        self._ready = {}
+        self.tools_by_server = {}
+        self._tool_index = {}
+
+
+def tool_specs(tools_by_server: Dict[str, List]) -> Dict[str, List[dict]]:
+    """Each tool's name, description and argument schema, per server."""
+    return {
+        server: [
+            {
+                "name": t.name,
+                "description": t.description,
+                "args_schema": t.args_schema if isinstance(t.args_schema, dict)
+                else t.args_schema.model_json_schema(),
+            }
+            for t in tools
+        ]
+        for server, tools in tools_by_server.items()
+    }
+
+
+def tool_specs_path(cache_dir: Path, server_files: Iterable[Path]) -> Path:
+    """Cache file for the tool specs, keyed on the server sources' mtimes."""
+    stamp = repr(sorted((str(f), f.stat().st_mtime) for f in server_files))
+    key = hashlib.blake2b(stamp.encode(), digest_size=8).hexdigest()
+    return cache_dir / f"tools_{key}.json"
+
+
+def load_tool_specs(path: Path) -> Optional[Dict[str, List[dict]]]:
+    """Read cached tool specs, or None if there is no usable cache file."""
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def save_tool_specs(path: Path, specs: Dict[str, List[dict]]):
+    """Persist tool specs (see tool_specs) for load_tool_specs."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(specs))
+    except OSError:
+        # Read-only deployments just keep paying the handshake on cold start
+        pass
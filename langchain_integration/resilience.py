@@ -6,13 +6,24 @@ Ensures robust operation even when individual tools or servers fail.
 """
 
 import asyncio
-from typing import Callable, Any, Optional, TypeVar
+import logging
+import random
+import re
+from typing import Callable, Any, Dict, Iterable, Optional, TypeVar
 from functools import wraps
 import time
 
 
 T = TypeVar('T')
 
+logger = logging.getLogger(__name__)
+
+# Monotonic, so wall-clock (NTP) jumps can't reopen or stall a breaker early
+_now = time.monotonic
+
+# Errors that may clear up on their own and so are always worth another attempt
+_TRANSIENT_ERRORS = (OSError, TimeoutError, asyncio.TimeoutError)
+
 
 class RetryConfig:
     """Configuration for retry behavior."""
@@ -22,12 +33,14 @@ class RetryConfig:
         max_attempts: int = 3,
         initial_delay: float = 1.0,
         backoff_factor: float = 2.0,
-        max_delay: float = 30.0
+        max_delay: float = 30.0,
+        jitter: bool = True
     ):
         self.max_attempts = max_attempts
         self.initial_delay = initial_delay
         self.backoff_factor = backoff_factor
         self.max_delay = max_delay
+        self.jitter = jitter
 
 
 async def retry_with_backoff(
@@ -55,6 +68,7 @@ async def retry_with_backoff(
         config = RetryConfig()
     
     last_exception = None
+    last_error = None
     delay = config.initial_delay
     
     for attempt in range(1, config.max_attempts + 1):
@@ -67,10 +81,24 @@ async def retry_with_backoff(
                 # Last attempt, give up
                 raise
             
-            print(f"⚠️  Attempt {attempt}/{config.max_attempts} failed: {e}")
-            print(f"   Retrying in {delay:.1f}s...")
+            # The same error twice in a row is deterministic (bad args etc.);
+            # more attempts would only fail the same way. Transient errors
+            # (timeouts, dropped connections) often repeat verbatim, so they
+            # keep their full retry budget.
+            if not isinstance(e, _TRANSIENT_ERRORS):
+                error = repr(e)
+                if error == last_error:
+                    raise
+                last_error = error
             
-            await asyncio.sleep(delay)
+            # Full jitter, so calls that failed together don't retry together
+            sleep_for = random.uniform(0, delay) if config.jitter else delay
+            logger.warning(
+                "Attempt %d/%d failed: %s; retrying in %.1fs",
+                attempt, config.max_attempts, e, sleep_for
+            )
+            
+            await asyncio.sleep(sleep_for)
             delay = min(delay * config.backoff_factor, config.max_delay)
     
     raise last_exception
@@ -93,6 +121,11 @@ def retry_on_failure(config: Optional[RetryConfig] = None):
     return decorator
 
 
+# Circuit states as ints so the steady-state (CLOSED) check is one int compare
+_CLOSED, _OPEN, _HALF_OPEN = 0, 1, 2
+_STATE_NAMES = ("CLOSED", "OPEN", "HALF_OPEN")
+
+
 class CircuitBreaker:
     """
     Circuit breaker pattern for failing fast when a service is down.
@@ -101,6 +134,9 @@ class CircuitBreaker:
         CLOSED: Normal operation, requests go through
         OPEN: Service is failing, requests fail immediately
         HALF_OPEN: Testing if service has recovered
+    
+    State transitions never await, so they are atomic with respect to other
+    coroutines on the same event loop.
     """
     
     def __init__(
@@ -116,16 +152,26 @@ class CircuitBreaker:
         self.failure_count = 0
         self.success_count = 0
         self.last_failure_time = None
-        self.state = "CLOSED"
+        self._recovery_deadline = 0.0
+        self._state = _CLOSED
+        self._probing = False
+    
+    @property
+    def state(self) -> str:
+        """Current state name (CLOSED, OPEN or HALF_OPEN)."""
+        return _STATE_NAMES[self._state]
     
     def is_open(self) -> bool:
         """Check if circuit is open (failing fast)."""
-        if self.state == "OPEN":
+        state = self._state
+        if state == _CLOSED:
+            return False
+        if state == _OPEN:
             # Check if we should try recovery
-            if time.time() - self.last_failure_time >= self.recovery_timeout:
-                self.state = "HALF_OPEN"
+            if _now() >= self._recovery_deadline:
+                self._state = _HALF_OPEN
                 self.success_count = 0
-                print("🔄 Circuit breaker: OPEN → HALF_OPEN (testing recovery)")
+                logger.info("Circuit breaker: OPEN -> HALF_OPEN (testing recovery)")
                 return False
             return True
         return False
@@ -134,23 +180,26 @@ class CircuitBreaker:
         """Record a successful call."""
         self.failure_count = 0
         
-        if self.state == "HALF_OPEN":
+        if self._state == _HALF_OPEN:
             self.success_count += 1
             if self.success_count >= self.success_threshold:
-                self.state = "CLOSED"
-                print("✅ Circuit breaker: HALF_OPEN → CLOSED (recovered)")
+                self._state = _CLOSED
+                logger.info("Circuit breaker: HALF_OPEN -> CLOSED (recovered)")
     
     def record_failure(self):
         """Record a failed call."""
         self.failure_count += 1
-        self.last_failure_time = time.time()
+        self.last_failure_time = _now()
+        self._recovery_deadline = self.last_failure_time + self.recovery_timeout
         
-        if self.state == "HALF_OPEN":
-            self.state = "OPEN"
-            print("❌ Circuit breaker: HALF_OPEN → OPEN (recovery failed)")
+        if self._state == _HALF_OPEN:
+            self._state = _OPEN
+            logger.warning("Circuit breaker: HALF_OPEN -> OPEN (recovery failed)")
         elif self.failure_count >= self.failure_threshold:
-            self.state = "OPEN"
-            print(f"❌ Circuit breaker: CLOSED → OPEN ({self.failure_count} failures)")
+            self._state = _OPEN
+            logger.warning(
+                "Circuit breaker: CLOSED -> OPEN (%d failures)", self.failure_count
+            )
     
     async def call(self, func: Callable[..., T], *args, **kwargs) -> T:
         """
@@ -162,6 +211,15 @@ class CircuitBreaker:
         if self.is_open():
             raise Exception(f"Circuit breaker is OPEN (service unavailable)")
         
+        # Snapshot before awaiting: while HALF_OPEN only one trial call may be
+        # in flight, otherwise a gathered fan-out would all hit the recovering
+        # server at once
+        probe = self._state == _HALF_OPEN
+        if probe:
+            if self._probing:
+                raise Exception(f"Circuit breaker is HALF_OPEN (recovery probe in flight)")
+            self._probing = True
+        
         try:
             result = await func(*args, **kwargs)
             self.record_success()
@@ -169,6 +227,33 @@ class CircuitBreaker:
         except Exception as e:
             self.record_failure()
             raise
+        finally:
+            if probe:
+                self._probing = False
+
+
+# Fallback payloads by tool-name keyword (shared, treat as read-only). Branches
+# of the anchored alternation are tried in order, so a name containing several
+# keywords still resolves by this precedence, not by position in the name.
+_DEMO_DATA = {
+    "fighter_stats": {
+        "name": "Unknown Fighter",
+        "record": "N/A",
+        "note": "Fighter data unavailable"
+    },
+    "odds": {
+        "odds": "N/A",
+        "note": "Betting data unavailable"
+    },
+    "news": {
+        "articles": [],
+        "note": "News data unavailable"
+    },
+}
+_NO_DEMO_DATA = {"note": "Data unavailable"}
+_DEMO_RE = re.compile(
+    "(?:" + "|".join(f".*({re.escape(k)})" for k in _DEMO_DATA) + ")", re.DOTALL
+)
 
 
 class FallbackHandler:
@@ -197,24 +282,8 @@ class FallbackHandler:
     @staticmethod
     def _get_demo_data(tool_name: str) -> dict:
         """Get demo/default data for a tool."""
-        if "fighter_stats" in tool_name:
-            return {
-                "name": "Unknown Fighter",
-                "record": "N/A",
-                "note": "Fighter data unavailable"
-            }
-        elif "odds" in tool_name:
-            return {
-                "odds": "N/A",
-                "note": "Betting data unavailable"
-            }
-        elif "news" in tool_name:
-            return {
-                "articles": [],
-                "note": "News data unavailable"
-            }
-        else:
-            return {"note": "Data unavailable"}
+        m = _DEMO_RE.match(tool_name)
+        return _DEMO_DATA[m.group(m.lastindex)] if m else _NO_DEMO_DATA
 
 
 async def call_with_timeout(
@@ -247,6 +316,30 @@ _circuit_breakers = {}
 
 def get_circuit_breaker(server_name: str) -> CircuitBreaker:
     """Get or create a circuit breaker for a server."""
-    if server_name not in _circuit_breakers:
-        _circuit_breakers[server_name] = CircuitBreaker()
-    return _circuit_breakers[server_name]
\ No newline at end of file
+    # One hash probe on the (usual) hit path; a breaker is only built on a miss
+    breaker = _circuit_breakers.get(server_name)
+    if breaker is None:
+        breaker = _circuit_breakers[server_name] = CircuitBreaker()
+    return breaker
+
+
+# Per-server bulkheads, keyed by MCP server config name: caps in-flight calls so
+# one fan-out can't flood a single server's stdio pipe
+DEFAULT_BULKHEAD_LIMIT = 4
+_bulkheads: Dict[str, asyncio.Semaphore] = {}
+
+
+def get_bulkhead(server_name: str, limit: int = DEFAULT_BULKHEAD_LIMIT) -> asyncio.Semaphore:
+    """Get or create the concurrency limiter for a server."""
+    bulkhead = _bulkheads.get(server_name)
+    if bulkhead is None:
+        bulkhead = _bulkheads[server_name] = asyncio.Semaphore(limit)
+    return bulkhead
+
+
+def preregister(server_names: Iterable[str]):
+    """Create breakers and bulkheads for known servers, keeping misses off the call path."""
+    for name in server_names:
+        if name not in _circuit_breakers:
+            _circuit_breakers[name] = CircuitBreaker()
+        get_bulkhead(name)
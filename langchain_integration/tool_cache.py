@@ -0,0 +1,108 @@
+"""
+Tool Cache Module
+
+Short-lived memoization of tool results so repeated questions about the same
+fighter don't pay for another MCP round-trip and upstream API call.
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Tuple
+
+import orjson
+
+
+# Tools whose output is expected to change minute to minute
+DEFAULT_UNCACHED_KEYWORDS = ("live", "latest", "hot")
+
+
+class ToolResultCache:
+    """
+    TTL + LRU cache for tool results, keyed by tool name and arguments.
+
+    Only successful results are stored; exceptions propagate to the caller.
+    Concurrent calls with the same key share one in-flight invocation.
+    ``ttls`` holds (keyword, seconds) pairs checked in order against the tool
+    name; tools matching none of them use ``ttl``.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        max_entries: int = 512,
+        uncached_keywords: Iterable[str] = DEFAULT_UNCACHED_KEYWORDS,
+        ttls: Iterable[Tuple[str, float]] = ()
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.uncached_keywords = tuple(uncached_keywords)
+        self.ttls = tuple(ttls)
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def make_key(tool_name: str, args: Dict[str, Any]) -> str:
+        """Stable digest of a tool call; argument order does not matter."""
+        payload = tool_name.encode() + b"\0" + orjson.dumps(
+            args, option=orjson.OPT_SORT_KEYS, default=str
+        )
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    def is_cacheable(self, tool_name: str) -> bool:
+        """Check whether results of this tool may be reused."""
+        return not any(k in tool_name for k in self.uncached_keywords)
+
+    def ttl_for(self, tool_name: str) -> float:
+        """Seconds a result of this tool stays fresh."""
+        return next((ttl for k, ttl in self.ttls if k in tool_name), self.ttl)
+
+    def __contains__(self, key: str) -> bool:
+        """Check whether a call (see make_key) has a fresh result or is in flight."""
+        entry = self._entries.get(key)
+        return key in self._pending or (entry is not None and entry[0] > time.monotonic())
+
+    async def invoke(self, tool, args: Dict[str, Any]) -> Any:
+        """
+        Invoke a tool, reusing a fresh cached result for identical arguments.
+
+        Args:
+            tool: LangChain tool exposing ``name`` and ``ainvoke``
+            args: Tool arguments
+
+        Returns:
+            Tool result (cached or fresh)
+        """
+        if not self.is_cacheable(tool.name):
+            return await tool.ainvoke(args)
+
+        key = self.make_key(tool.name, args)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None and entry[0] > now:
+            self._entries.move_to_end(key)
+            return entry[1]
+
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = asyncio.ensure_future(tool.ainvoke(args))
+            pending.add_done_callback(
+                lambda fut: self._store(key, fut, self.ttl_for(tool.name))
+            )
+        # Shielded so one waiter giving up doesn't cancel the call for the others
+        return await asyncio.shield(pending)
+
+    def _store(self, key: str, fut: asyncio.Future, ttl: float):
+        """Move a finished invocation from pending into the cache if it succeeded."""
+        self._pending.pop(key, None)
+        if fut.cancelled() or fut.exception() is not None:
+            return
+        self._entries[key] = (time.monotonic() + ttl, fut.result())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached results; calls already in flight are left to finish."""
+        self._entries.clear()
@@ -0,0 +1,38 @@
+"""
+Tool Messages Module
+
+Turns tool results into the text sent back to the model as ToolMessage content,
+shared by the CLI and the Streamlit app.
+"""
+
+from typing import Any
+
+import orjson
+
+
+# Upper bound on one tool result's share of the prompt; results are re-sent with
+# every later turn, so a single oversized payload inflates the whole conversation
+MAX_TOOL_RESULT_CHARS = 8000
+
+
+def encode(value: Any, option: int = 0) -> str:
+    """JSON-encode structured values with orjson; strings pass through unchanged."""
+    if isinstance(value, str):
+        return value
+    try:
+        return orjson.dumps(value, default=str, option=option).decode()
+    except TypeError:
+        return str(value)
+
+
+def tool_message_content(result: Any, max_chars: int = MAX_TOOL_RESULT_CHARS) -> str:
+    """
+    Serialize a tool result for the model, truncating oversized payloads.
+
+    Compact JSON is cheaper to build than repr() and costs fewer tokens.
+    """
+    content = encode(result)
+    if len(content) > max_chars:
+        dropped = len(content) - max_chars
+        content = f"{content[:max_chars]}... [truncated {dropped} chars]"
+    return content
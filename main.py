@@ -5,14 +5,26 @@ Multi-server MCP system with LangChain orchestration
 """
 
 import asyncio
+import hashlib
+import io
 import os
 import time
+from collections import Counter
 from pathlib import Path
+
+import orjson
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, ToolMessage
 from dotenv import load_dotenv
 
+from langchain_integration.console import ainput
+from langchain_integration.mcp_sessions import (
+    PersistentSessions, load_tool_specs, save_tool_specs, tool_specs, tool_specs_path
+)
+from langchain_integration.resilience import FallbackHandler, get_bulkhead, preregister
+from langchain_integration.tool_messages import encode, tool_message_content
+
 load_dotenv()
 
 # Optional observability
@@ -57,95 +69,165 @@ async def setup_platform():
     
     print("\nInitializing servers...")
     client = MultiServerMCPClient(server_config)
+    preregister(server_config)
+    
+    # Open the Anthropic connection (TLS handshake, key check) while the servers
+    # start, so the first query doesn't pay for it
+    model = ChatAnthropic(model="claude-sonnet-4-20250514", temperature=0)
+    warmup = asyncio.create_task(model.ainvoke([HumanMessage(content="ping")], max_tokens=1))
     
     print("Loading tools...")
-    tools = await client.get_tools()
+    # One session per server for the whole run; tools from client.get_tools()
+    # would spawn a fresh server subprocess on every call
+    sessions = PersistentSessions(client)
+    server_files = [Path(cfg["args"][0]) for cfg in server_config.values()]
+    specs_path = tool_specs_path(project_root / ".cache", server_files)
+    specs = load_tool_specs(specs_path)
+    if specs:
+        # Known tool schemas from an earlier run: the servers boot (concurrently)
+        # in the background while the user picks a mode
+        sessions.start_soon()
+    else:
+        try:
+            specs = tool_specs(await sessions.start())
+        except BaseException:
+            warmup.cancel()
+            raise
+        save_tool_specs(specs_path, specs)
+    # The tools forward to their server's current session, so a server that
+    # dies mid-run is reopened on its next call
+    tools_by_server = sessions.lazy_tools(specs)
+    tools = [tool for server_tools in tools_by_server.values() for tool in server_tools]
+    tool_map = {tool.name: tool for tool in tools}
+    tool_to_server = {
+        tool.name: name
+        for name, server_tools in tools_by_server.items()
+        for tool in server_tools
+    }
     print(f"Loaded {len(tools)} tools from {len(server_config)} servers")
     
-    # Create Claude agent
-    model = ChatAnthropic(model="claude-sonnet-4-20250514", temperature=0)
+    # Create Claude agent; an invalid key or unreachable API fails setup here
+    try:
+        await warmup
+    except BaseException:
+        # Sessions may already be booting (cached specs); don't leave the
+        # server subprocesses behind
+        await sessions.close()
+        raise
     agent = model.bind_tools(tools)
     
     print("="*70)
     print("Platform ready\n")
     
-    return client, tools, agent
+    return sessions, tools, tool_map, tool_to_server, agent
+
+
+# Guards against a model that keeps re-issuing the same calls
+MAX_TURNS = 12
+LOOP_THRESHOLD = 3
 
 
-async def execute_query(query: str, agent, tools):
+def _call_key(tool_call: dict) -> tuple:
+    """Identity of a tool call: its name plus a digest of its arguments."""
+    args = encode(tool_call['args'], orjson.OPT_SORT_KEYS).encode()
+    return tool_call['name'], hashlib.blake2b(args, digest_size=8).hexdigest()
+
+
+async def _invoke(tool_call: dict, tool_map: dict, tool_to_server: dict):
+    """Run one tool call; a failing tool yields fallback data instead of raising."""
+    tool_name = tool_call['name']
+    start_time = time.perf_counter()
+    tool = tool_map.get(tool_name)
+    try:
+        if tool is None:
+            result = f"Error: Tool {tool_name} not found"
+        else:
+            async with get_bulkhead(tool_to_server[tool_name]):
+                result = await tool.ainvoke(tool_call['args'])
+    except Exception as e:
+        result = FallbackHandler.get_fallback(tool_name, e)
+    return result, (time.perf_counter() - start_time) * 1000
+
+
+async def execute_query(query: str, agent, tool_map: dict, tool_to_server: dict):
     """Execute a query using the agent and tools."""
     
     if OBSERVABILITY_AVAILABLE:
         get_monitor().log_query(query)
     
-    tool_map = {tool.name: tool for tool in tools}
     messages = [HumanMessage(content=query)]
+    seen = Counter()
     
-    while True:
+    for _ in range(MAX_TURNS):
         response = await agent.ainvoke(messages)
         messages.append(response)
         
         if hasattr(response, 'tool_calls') and response.tool_calls:
             for tool_call in response.tool_calls:
-                tool_name = tool_call['name']
-                tool_args = tool_call['args']
-                
-                start_time = time.time()
-                tool = tool_map.get(tool_name)
-                result = await tool.ainvoke(tool_args) if tool else f"Error: Tool {tool_name} not found"
-                
-                if OBSERVABILITY_AVAILABLE:
-                    duration_ms = (time.time() - start_time) * 1000
-                    get_monitor().log_tool_call(tool_name, duration_ms)
-                
-                messages.append(ToolMessage(content=str(result), tool_call_id=tool_call['id']))
+                key = _call_key(tool_call)
+                seen[key] += 1
+                if seen[key] > LOOP_THRESHOLD:
+                    return f"Aborted: tool loop detected on {key[0]}"
+            
+            # Independent calls (often on different servers) run concurrently;
+            # gather keeps call order so each ToolMessage pairs with its id
+            results = await asyncio.gather(
+                *(_invoke(tool_call, tool_map, tool_to_server) for tool_call in response.tool_calls)
+            )
+            if OBSERVABILITY_AVAILABLE:
+                get_monitor().log_tool_calls_batch(
+                    (tool_call['name'], duration_ms)
+                    for tool_call, (_, duration_ms) in zip(response.tool_calls, results)
+                )
+            for tool_call, (result, _) in zip(response.tool_calls, results):
+                messages.append(ToolMessage(content=tool_message_content(result), tool_call_id=tool_call['id']))
         else:
-            break
+            return response.content
     
-    return response.content
+    return f"Aborted: no final answer after {MAX_TURNS} turns"
 
 
-async def demo_simple_query(agent, tools):
+async def demo_simple_query(agent, tool_map, tool_to_server, out=None):
     """Demo: Simple single-server query."""
-    print("\n" + "="*70)
-    print("DEMO 1: Simple Query")
-    print("="*70)
+    print("\n" + "="*70, file=out)
+    print("DEMO 1: Simple Query", file=out)
+    print("="*70, file=out)
     
     query = "What are Tyson Fury's career stats?"
-    print(f"\nQuery: {query}\n")
+    print(f"\nQuery: {query}\n", file=out)
     
-    result = await execute_query(query, agent, tools)
+    result = await execute_query(query, agent, tool_map, tool_to_server)
     
-    print("Response:")
-    print("-" * 70)
-    print(result)
-    print("-" * 70)
+    print("Response:", file=out)
+    print("-" * 70, file=out)
+    print(result, file=out)
+    print("-" * 70, file=out)
 
 
-async def demo_reddit_query(agent, tools):
+async def demo_reddit_query(agent, tool_map, tool_to_server, out=None):
     """Demo: Reddit social media analysis."""
-    print("\n" + "="*70)
-    print("DEMO 2: Reddit Social Media Analysis")
-    print("="*70)
+    print("\n" + "="*70, file=out)
+    print("DEMO 2: Reddit Social Media Analysis", file=out)
+    print("="*70, file=out)
     
     query = """What's the Reddit community sentiment on Tyson Fury? 
     Compare his Reddit buzz to Oleksandr Usyk and provide a social media intelligence report."""
     
-    print(f"\nQuery: Reddit sentiment analysis\n")
+    print(f"\nQuery: Reddit sentiment analysis\n", file=out)
     
-    result = await execute_query(query, agent, tools)
+    result = await execute_query(query, agent, tool_map, tool_to_server)
     
-    print("Response:")
-    print("-" * 70)
-    print(result)
-    print("-" * 70)
+    print("Response:", file=out)
+    print("-" * 70, file=out)
+    print(result, file=out)
+    print("-" * 70, file=out)
 
 
-async def demo_multi_server_query(agent, tools):
+async def demo_multi_server_query(agent, tool_map, tool_to_server, out=None):
     """Demo: Complex multi-server query."""
-    print("\n" + "="*70)
-    print("DEMO 3: Multi-Server Query")
-    print("="*70)
+    print("\n" + "="*70, file=out)
+    print("DEMO 3: Multi-Server Query", file=out)
+    print("="*70, file=out)
     
     query = """Complete intelligence analysis for Tyson Fury vs Anthony Joshua:
     1. Compare their fighter statistics and career trajectories
@@ -154,17 +236,17 @@ async def demo_multi_server_query(agent, tools):
     4. What's the Reddit community sentiment and buzz comparison?
     5. Provide a comprehensive decision recommendation"""
     
-    print(f"\nQuery: Complete multi-source analysis\n")
+    print(f"\nQuery: Complete multi-source analysis\n", file=out)
     
-    result = await execute_query(query, agent, tools)
+    result = await execute_query(query, agent, tool_map, tool_to_server)
     
-    print("Response:")
-    print("-" * 70)
-    print(result)
-    print("-" * 70)
+    print("Response:", file=out)
+    print("-" * 70, file=out)
+    print(result, file=out)
+    print("-" * 70, file=out)
 
 
-async def interactive_mode(agent, tools):
+async def interactive_mode(agent, tool_map, tool_to_server):
     """Interactive query mode."""
     print("\n" + "="*70)
     print("INTERACTIVE MODE")
@@ -178,7 +260,7 @@ async def interactive_mode(agent, tools):
     
     while True:
         try:
-            query = input("Query: ").strip()
+            query = (await ainput("Query: ")).strip()
             
             if query.lower() in ['quit', 'exit', 'q']:
                 print("\nExiting...")
@@ -190,7 +272,7 @@ async def interactive_mode(agent, tools):
                 continue
             
             print()
-            result = await execute_query(query, agent, tools)
+            result = await execute_query(query, agent, tool_map, tool_to_server)
             
             print("\nResponse:")
             print("-" * 70)
@@ -198,7 +280,7 @@ async def interactive_mode(agent, tools):
             print("-" * 70)
             print()
             
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, asyncio.CancelledError):
             print("\n\nExiting...")
             if OBSERVABILITY_AVAILABLE:
                 get_monitor().print_summary()
@@ -207,6 +289,46 @@ async def interactive_mode(agent, tools):
             print(f"\nError: {e}\n")
 
 
+# (label, env vars that must all be set, required, message when missing)
+PREFLIGHT_CHECKS = (
+    ("ANTHROPIC_API_KEY", ("ANTHROPIC_API_KEY",), True,
+     "ANTHROPIC_API_KEY not set"),
+    ("ODDS_API_KEY", ("ODDS_API_KEY",), False,
+     "ODDS_API_KEY not set (limited betting features)"),
+    ("REDDIT_CLIENT_ID/SECRET", ("REDDIT_CLIENT_ID", "REDDIT_CLIENT_SECRET"), False,
+     "Reddit API not set (limited social features)"),
+    ("NEWS_API_KEY", ("NEWS_API_KEY",), False,
+     "NEWS_API_KEY not set (limited news features)"),
+)
+
+
+def run_preflight_checks():
+    """
+    Check credentials and the local database, printing the report in one write.
+    
+    Returns:
+        (whether all required checks passed, {label: check passed})
+    """
+    env = os.environ
+    results = {}
+    passed = True
+    lines = ["\nPre-flight checks:"]
+    
+    for label, names, required, missing in PREFLIGHT_CHECKS:
+        ok = results[label] = all(env.get(name) for name in names)
+        if ok:
+            lines.append(f"  [OK] {label}")
+        else:
+            lines.append(f"  [{'FAIL' if required else 'WARN'}] {missing}")
+            passed = passed and not required
+    
+    ok = results["Boxing database"] = Path("data/boxing_data.db").exists()
+    lines.append("  [OK] Boxing database" if ok else "  [WARN] Boxing database not found")
+    
+    print("\n".join(lines))
+    return passed, results
+
+
 async def main():
     """Main entry point."""
     
@@ -216,35 +338,7 @@ async def main():
         setup_langsmith()
     
     # Pre-flight checks
-    print("\nPre-flight checks:")
-    
-    checks_passed = True
-    
-    if not os.getenv("ANTHROPIC_API_KEY"):
-        print("  [FAIL] ANTHROPIC_API_KEY not set")
-        checks_passed = False
-    else:
-        print("  [OK] ANTHROPIC_API_KEY")
-    
-    if os.getenv("ODDS_API_KEY"):
-        print("  [OK] ODDS_API_KEY")
-    else:
-        print("  [WARN] ODDS_API_KEY not set (limited betting features)")
-    
-    if os.getenv("REDDIT_CLIENT_ID") and os.getenv("REDDIT_CLIENT_SECRET"):
-        print("  [OK] REDDIT_CLIENT_ID/SECRET")
-    else:
-        print("  [WARN] Reddit API not set (limited social features)")
-    
-    if os.getenv("NEWS_API_KEY"):
-        print("  [OK] NEWS_API_KEY")
-    else:
-        print("  [WARN] NEWS_API_KEY not set (limited news features)")
-    
-    if Path("data/boxing_data.db").exists():
-        print("  [OK] Boxing database")
-    else:
-        print("  [WARN] Boxing database not found")
+    checks_passed, _ = run_preflight_checks()
     
     if not checks_passed:
         print("\nCritical checks failed. Exiting.")
@@ -252,44 +346,63 @@ async def main():
     
     # Setup platform
     try:
-        client, tools, agent = await setup_platform()
+        sessions, tools, tool_map, tool_to_server, agent = await setup_platform()
     except Exception as e:
         print(f"\nFailed to setup platform: {e}")
         import traceback
         traceback.print_exc()
         return
     
-    # Run mode selection
-    print("\nSelect mode:")
-    print("  1 - Run all demos")
-    print("  2 - Interactive mode")
-    print("  3 - Reddit demo only")
-    print("  4 - Multi-server demo only")
-    
-    choice = input("\nChoice (1-4, default=1): ").strip() or "1"
-    
-    if choice == "2":
-        await interactive_mode(agent, tools)
-    elif choice == "3":
-        await demo_reddit_query(agent, tools)
-        if OBSERVABILITY_AVAILABLE:
-            get_monitor().print_summary()
-    elif choice == "4":
-        await demo_multi_server_query(agent, tools)
-        if OBSERVABILITY_AVAILABLE:
-            get_monitor().print_summary()
-    else:
-        await demo_simple_query(agent, tools)
-        await demo_reddit_query(agent, tools)
-        await demo_multi_server_query(agent, tools)
+    try:
+        # Run mode selection
+        print("\nSelect mode:")
+        print("  1 - Run all demos")
+        print("  2 - Interactive mode")
+        print("  3 - Reddit demo only")
+        print("  4 - Multi-server demo only")
         
-        if OBSERVABILITY_AVAILABLE:
-            get_monitor().print_summary()
+        choice = (await ainput("\nChoice (1-4, default=1): ")).strip() or "1"
         
-        cont = input("\nTry interactive mode? (y/n): ").strip().lower()
-        if cont == 'y':
-            await interactive_mode(agent, tools)
+        if choice == "2":
+            await interactive_mode(agent, tool_map, tool_to_server)
+        elif choice == "3":
+            await demo_reddit_query(agent, tool_map, tool_to_server)
+            if OBSERVABILITY_AVAILABLE:
+                get_monitor().print_summary()
+        elif choice == "4":
+            await demo_multi_server_query(agent, tool_map, tool_to_server)
+            if OBSERVABILITY_AVAILABLE:
+                get_monitor().print_summary()
+        else:
+            # The demos share no state, so their model and tool latency can
+            # overlap; each writes to its own buffer to keep the reports apart
+            buffers = [io.StringIO() for _ in range(3)]
+            # A failing demo must not hide the reports of the ones that finished
+            outcomes = await asyncio.gather(
+                demo_simple_query(agent, tool_map, tool_to_server, out=buffers[0]),
+                demo_reddit_query(agent, tool_map, tool_to_server, out=buffers[1]),
+                demo_multi_server_query(agent, tool_map, tool_to_server, out=buffers[2]),
+                return_exceptions=True,
+            )
+            for buffer in buffers:
+                print(buffer.getvalue(), end="")
+            for outcome in outcomes:
+                if isinstance(outcome, BaseException):
+                    print(f"\nDemo failed: {outcome!r}")
+            
+            if OBSERVABILITY_AVAILABLE:
+                get_monitor().print_summary()
+            
+            cont = (await ainput("\nTry interactive mode? (y/n): ")).strip().lower()
+            if cont == 'y':
+                await interactive_mode(agent, tool_map, tool_to_server)
+    finally:
+        # Stop the server subprocesses before the loop goes away
+        await sessions.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
\ No newline at end of file
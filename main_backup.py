@@ -5,14 +5,18 @@ Complete multi-server MCP system with LangChain orchestration and observability
 """
 
 import asyncio
+import json
 import os
 import time
 from pathlib import Path
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langchain_anthropic import ChatAnthropic
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import HumanMessage, ToolMessage
 from dotenv import load_dotenv
 
+from langchain_integration.console import ainput
+from langchain_integration.tool_cache import ToolResultCache
+
 # Load environment variables
 load_dotenv()
 
@@ -26,12 +30,22 @@ except ImportError:
     print("   Install: cp monitoring.py observability/")
 
 
+# Display group -> tool name keywords. A tool lands in the first matching
+# group; News goes first so compare_fighter_hype and get_fight_predictions
+# aren't claimed by the analytics and odds keywords
+TOOL_CATEGORIES = {
+    "Fight News": ("news", "social", "hype", "prediction", "press"),
+    "Betting & Odds": ("odds", "betting", "predict", "value", "trend"),
+    "Boxing Analytics": ("fighter", "compare", "career", "upcoming"),
+}
+
+
 async def setup_boxing_platform():
     """
     Initialize the Boxing Intelligence Platform with all three servers.
     
     Returns:
-        tuple: (client, tools, agent) ready for queries
+        tuple: (client, tools, tool_map, agent) ready for queries
     """
     print("\n" + "="*70)
     print("🥊 BOXING INTELLIGENCE PLATFORM")
@@ -69,43 +83,55 @@ async def setup_boxing_platform():
     # Create MCP client
     client = MultiServerMCPClient(server_config)
     
+    # Open the Anthropic connection (TLS handshake, key check) while the
+    # servers start, so the first demo doesn't pay for it
+    model = ChatAnthropic(
+        model="claude-sonnet-4-20250514",
+        temperature=0
+    )
+    warmup = asyncio.create_task(model.ainvoke([HumanMessage(content="ping")], max_tokens=1))
+    
     # Load all tools
     print("🔧 Loading tools from all servers...")
-    tools = await client.get_tools()
+    try:
+        # One handshake per server, all at once: startup waits for the slowest
+        # server rather than the sum of the three
+        tool_lists = await asyncio.gather(
+            *(client.get_tools(server_name=name) for name in server_config)
+        )
+    except BaseException:
+        warmup.cancel()
+        raise
+    tools = [tool for server_tools in tool_lists for tool in server_tools]
     print(f"Loaded {len(tools)} tools!\n")
     
     # Show tools by server
     print("📊 Available Tools:")
     
-    # Group tools by server (approximate by tool name patterns)
-    analytics_tools = [t for t in tools if any(x in t.name for x in ['fighter', 'compare', 'career', 'upcoming'])]
-    odds_tools = [t for t in tools if any(x in t.name for x in ['odds', 'betting', 'predict', 'value', 'trend'])]
-    news_tools = [t for t in tools if any(x in t.name for x in ['news', 'social', 'hype', 'prediction', 'press'])]
-    
-    if analytics_tools:
-        print(f"\n   Boxing Analytics ({len(analytics_tools)} tools):")
-        for tool in analytics_tools[:3]:
-            print(f"      • {tool.name}")
-    
-    if odds_tools:
-        print(f"\n   Betting & Odds ({len(odds_tools)} tools):")
-        for tool in odds_tools[:3]:
-            print(f"      • {tool.name}")
+    # Group tools by server (approximate by tool name patterns), one pass
+    groups = {category: [] for category in TOOL_CATEGORIES}
+    for t in tools:
+        for category, keywords in TOOL_CATEGORIES.items():
+            if any(k in t.name for k in keywords):
+                groups[category].append(t)
+                break
     
-    if news_tools:
-        print(f"\n   Fight News ({len(news_tools)} tools):")
-        for tool in news_tools[:3]:
-            print(f"      • {tool.name}")
+    # Listed in server config order, the reverse of the matching order
+    for category, group in reversed(groups.items()):
+        if group:
+            print(f"\n   {category} ({len(group)} tools):")
+            for tool in group[:3]:
+                print(f"      • {tool.name}")
     
-    print(f"\n   ... and {len(tools) - len(analytics_tools) - len(odds_tools) - len(news_tools)} more")
+    print(f"\n   ... and {len(tools) - sum(map(len, groups.values()))} more")
     
     # Create Claude agent with all tools
     print("\n🤖 Creating Claude Sonnet 4.5 agent with all tools...")
-    model = ChatAnthropic(
-        model="claude-sonnet-4-20250514",
-        temperature=0
-    )
+    # An invalid key or unreachable API fails setup here, not in the first demo
+    await warmup
     agent = model.bind_tools(tools)
+    # Tool name -> tool mapping for execution, shared by every query
+    tool_map = {tool.name: tool for tool in tools}
     print("Agent ready!\n")
     
     print("="*70)
@@ -113,72 +139,208 @@ async def setup_boxing_platform():
     print("="*70)
     print()
     
-    return client, tools, agent
+    return client, tools, tool_map, agent
 
 
-async def demo_simple_query(agent, tools):
-    """Run a simple single-server query."""
-    print("\n" + "="*70)
-    print("DEMO 1: Simple Query (Single Server)")
-    print("="*70)
+# Odds move quickly, media coverage slowly and career stats hardly at all
+TOOL_TTLS = (
+    ("odds", 60.0), ("betting", 60.0), ("predict", 60.0), ("value", 60.0),
+    ("news", 300.0), ("social", 300.0), ("hype", 300.0), ("press", 300.0),
+    ("fighter", 3600.0), ("career", 3600.0), ("compare", 3600.0),
+)
+
+# Shared by every query in the process, so repeated demos reuse results
+tool_cache = ToolResultCache(ttl=60.0, ttls=TOOL_TTLS)
+
+
+async def invoke_tool(tool_call: dict, tool_map: dict):
+    """
+    Execute one tool call.
     
-    query = "What are Tyson Fury's career stats?"
-    print(f"\nQuery: {query}\n")
-    print("Analyzing...\n")
+    Returns:
+        tuple: (result, duration in ms)
+    """
+    tool_name = tool_call['name']
+    start_time = time.perf_counter()
+    
+    tool = tool_map.get(tool_name)
+    if tool:
+        try:
+            result = await tool_cache.invoke(tool, tool_call['args'])
+        except Exception as e:
+            # One failing tool must not cancel the other calls in the turn
+            result = f"Error: Tool {tool_name} failed: {e}"
+    else:
+        result = f"Error: Tool {tool_name} not found"
+    
+    return result, (time.perf_counter() - start_time) * 1000
+
+
+# A deliberately small heuristic, not a fighter directory: a query naming one of
+# these fighters starts a get_fighter_stats prefetch as soon as it arrives,
+# hiding that call's latency behind the model's first turn. A miss only costs
+# one wasted call, and unlisted fighters are simply not prefetched.
+SPECULATION_FIGHTERS = {
+    "fury": "Tyson Fury",
+    "joshua": "Anthony Joshua",
+    "usyk": "Oleksandr Usyk",
+    "canelo": "Canelo Alvarez",
+    "benavidez": "David Benavidez",
+    "crawford": "Terence Crawford",
+}
+# One guess per query bounds the load a wrong guess adds to the server
+MAX_SPECULATIONS = 1
+
+
+def predict_tool_calls(query: str, tool_map: dict) -> list:
+    """Guess the first tool calls a query will need, as (tool name, args) pairs."""
+    if "get_fighter_stats" not in tool_map:
+        return []
+    query_lc = query.lower()
+    names = [name for alias, name in SPECULATION_FIGHTERS.items() if alias in query_lc]
+    return [("get_fighter_stats", {"name": name}) for name in names[:MAX_SPECULATIONS]]
+
+
+def message_text(content) -> str:
+    """Text of a message or chunk; Anthropic streams content as a list of blocks."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") for block in content
+        if isinstance(block, dict) and block.get("type") == "text"
+    )
+
+
+def completed_tool_call(response, index):
+    """The tool call streamed at ``index``, or None if its arguments don't parse."""
+    for chunk in response.tool_call_chunks:
+        if chunk.get("index") == index and chunk.get("id"):
+            try:
+                args = json.loads(chunk.get("args") or "{}")
+            except ValueError:
+                return None
+            return {"name": chunk["name"], "args": args, "id": chunk["id"]}
+    return None
+
+
+async def run_agent(agent, tool_map: dict, query: str, stream: bool = False) -> str:
+    """
+    Run the agent loop for one query until the model stops calling tools.
+    
+    Args:
+        stream: Print the model's text to stdout as it is generated
     
+    Returns:
+        str: The final response text
+    """
     # Track query
     if OBSERVABILITY_AVAILABLE:
         monitor = get_monitor()
         monitor.log_query(query)
     
-    # Create tool name -> tool mapping for execution
-    tool_map = {tool.name: tool for tool in tools}
-    
     messages = [HumanMessage(content=query)]
     
-    # Keep invoking until no more tool calls
-    while True:
-        response = await agent.ainvoke(messages)
-        messages.append(response)
-        
-        # Check if there are tool calls
-        if hasattr(response, 'tool_calls') and response.tool_calls:
-            # Execute tool calls
-            for tool_call in response.tool_calls:
-                tool_name = tool_call['name']
-                tool_args = tool_call['args']
-                
-                # Time tool execution
-                start_time = time.time()
-                
-                # Get the tool and execute it
-                tool = tool_map.get(tool_name)
-                if tool:
-                    result = await tool.ainvoke(tool_args)
-                else:
-                    result = f"Error: Tool {tool_name} not found"
-                
-                # Track tool call performance
+    # Start likely calls now; a matching call from the model awaits the
+    # running task instead of starting over. Calls the cache already holds
+    # (or is running) gain nothing from a prefetch.
+    speculative = {}
+    for name, args in predict_tool_calls(query, tool_map):
+        key = ToolResultCache.make_key(name, args)
+        if key not in tool_cache:
+            speculative[key] = asyncio.create_task(
+                invoke_tool({'name': name, 'args': args}, tool_map)
+            )
+    started = {}
+    
+    def dispatch(tool_call):
+        """Start a tool call (or adopt its prefetch) -> (task, speculated)."""
+        task = speculative.pop(ToolResultCache.make_key(tool_call['name'], tool_call['args']), None)
+        if task is not None:
+            return task, True
+        return asyncio.ensure_future(invoke_tool(tool_call, tool_map)), False
+    
+    try:
+        # Keep invoking until no more tool calls
+        while True:
+            response = None
+            last_index = None
+            printed = False
+            async for chunk in agent.astream(messages):
+                response = chunk if response is None else response + chunk
+                if stream:
+                    text = message_text(chunk.content)
+                    if text:
+                        print(text, end="", flush=True)
+                        printed = True
+                # Chunks for a new tool call mean the previous call's arguments
+                # are complete, so it can run while the model keeps decoding
+                for tool_chunk in chunk.tool_call_chunks:
+                    index = tool_chunk.get("index")
+                    if index is None or index == last_index:
+                        continue
+                    tool_call = last_index is not None and completed_tool_call(response, last_index)
+                    if tool_call and tool_call['id'] not in started:
+                        started[tool_call['id']] = dispatch(tool_call)
+                    last_index = index
+            if printed:
+                print(flush=True)
+            messages.append(response)
+            
+            # Check if there are tool calls
+            if response.tool_calls:
+                # Calls not started during the stream (the last one) start now
+                running = [
+                    started.pop(tool_call['id'], None) or dispatch(tool_call)
+                    for tool_call in response.tool_calls
+                ]
+                # gather returns results in call order, so each ToolMessage
+                # still pairs with its tool_call_id
+                results = await asyncio.gather(*(task for task, _ in running))
+                # Track tool call performance, one monitor call per turn
                 if OBSERVABILITY_AVAILABLE:
-                    duration_ms = (time.time() - start_time) * 1000
-                    monitor.log_tool_call(tool_name, duration_ms)
+                    monitor.log_tool_calls_batch(
+                        (tool_call['name'], duration_ms, speculated)
+                        for tool_call, (_, speculated), (_, duration_ms) in zip(
+                            response.tool_calls, running, results
+                        )
+                    )
                 
-                # Add tool result to messages
-                from langchain_core.messages import ToolMessage
-                messages.append(ToolMessage(
-                    content=str(result),
-                    tool_call_id=tool_call['id']
-                ))
-        else:
-            break
+                # Add tool results to messages
+                for tool_call, (result, _) in zip(response.tool_calls, results):
+                    messages.append(ToolMessage(
+                        content=str(result),
+                        tool_call_id=tool_call['id']
+                    ))
+            else:
+                # No more tool calls, we have the final answer
+                return message_text(response.content)
+    finally:
+        # Guesses the model never asked for, and anything left mid-flight
+        for task in speculative.values():
+            task.cancel()
+        for task, _ in started.values():
+            task.cancel()
+
+
+async def demo_simple_query(agent, tool_map):
+    """Run a simple single-server query."""
+    print("\n" + "="*70)
+    print("DEMO 1: Simple Query (Single Server)")
+    print("="*70)
+    
+    query = "What are Tyson Fury's career stats?"
+    print(f"\nQuery: {query}\n")
+    print("Analyzing...\n")
+    
+    result = await run_agent(agent, tool_map, query)
     
     print("Response:")
     print("-" * 70)
-    print(response.content)
+    print(result)
     print("-" * 70)
 
 
-async def demo_multi_server_query(agent, tools):
+async def demo_multi_server_query(agent, tool_map):
     """Run a complex multi-server query."""
     print("\n" + "="*70)
     print("DEMO 2: Multi-Server Query (All Three Servers)")
@@ -201,60 +363,15 @@ Use all available intelligence sources.
     print("="*70)
     print("\nAgent orchestrating across all servers...\n")
     
-    # Track query
-    if OBSERVABILITY_AVAILABLE:
-        monitor = get_monitor()
-        monitor.log_query(query)
-    
-    # Create tool name -> tool mapping for execution
-    tool_map = {tool.name: tool for tool in tools}
-    
-    messages = [HumanMessage(content=query)]
-    
-    # Keep invoking until no more tool calls
-    while True:
-        response = await agent.ainvoke(messages)
-        messages.append(response)
-        
-        # Check if there are tool calls
-        if hasattr(response, 'tool_calls') and response.tool_calls:
-            # Execute tool calls
-            for tool_call in response.tool_calls:
-                tool_name = tool_call['name']
-                tool_args = tool_call['args']
-                
-                # Time tool execution
-                start_time = time.time()
-                
-                # Get the tool and execute it
-                tool = tool_map.get(tool_name)
-                if tool:
-                    result = await tool.ainvoke(tool_args)
-                else:
-                    result = f"Error: Tool {tool_name} not found"
-                
-                # Track tool call performance
-                if OBSERVABILITY_AVAILABLE:
-                    duration_ms = (time.time() - start_time) * 1000
-                    monitor.log_tool_call(tool_name, duration_ms)
-                
-                # Add tool result to messages
-                from langchain_core.messages import ToolMessage
-                messages.append(ToolMessage(
-                    content=str(result),
-                    tool_call_id=tool_call['id']
-                ))
-        else:
-            # No more tool calls, we have the final answer
-            break
+    result = await run_agent(agent, tool_map, query)
     
     print("Intelligence Report:")
     print("="*70)
-    print(response.content)
+    print(result)
     print("="*70)
 
 
-async def interactive_mode(agent, tools):
+async def interactive_mode(agent, tool_map):
     """Run interactive query mode."""
     print("\n" + "="*70)
     print("Interactive mode:")
@@ -267,12 +384,9 @@ async def interactive_mode(agent, tools):
     print("  • 'Find value bets in upcoming fights'")
     print()
     
-    # Create tool name -> tool mapping for execution
-    tool_map = {tool.name: tool for tool in tools}
-    
     while True:
         try:
-            query = input("Your boxing query: ").strip()
+            query = (await ainput("Your boxing query: ")).strip()
             
             if query.lower() in ['quit', 'exit', 'q']:
                 print("\nThanks for using the Boxing Intelligence Platform!")
@@ -285,59 +399,15 @@ async def interactive_mode(agent, tools):
             if not query:
                 continue
             
-            # Track query
-            if OBSERVABILITY_AVAILABLE:
-                monitor = get_monitor()
-                monitor.log_query(query)
-            
             print("\nAnalyzing...\n")
             
-            messages = [HumanMessage(content=query)]
-            
-            # Keep invoking until no more tool calls
-            while True:
-                response = await agent.ainvoke(messages)
-                messages.append(response)
-                
-                # Check if there are tool calls
-                if hasattr(response, 'tool_calls') and response.tool_calls:
-                    # Execute tool calls
-                    for tool_call in response.tool_calls:
-                        tool_name = tool_call['name']
-                        tool_args = tool_call['args']
-                        
-                        # Time tool execution
-                        start_time = time.time()
-                        
-                        # Get the tool and execute it
-                        tool = tool_map.get(tool_name)
-                        if tool:
-                            result = await tool.ainvoke(tool_args)
-                        else:
-                            result = f"Error: Tool {tool_name} not found"
-                        
-                        # Track tool call performance
-                        if OBSERVABILITY_AVAILABLE:
-                            duration_ms = (time.time() - start_time) * 1000
-                            monitor.log_tool_call(tool_name, duration_ms)
-                        
-                        # Add tool result to messages
-                        from langchain_core.messages import ToolMessage
-                        messages.append(ToolMessage(
-                            content=str(result),
-                            tool_call_id=tool_call['id']
-                        ))
-                else:
-                    # No more tool calls, we have the final answer
-                    break
-            
             print("Response:")
             print("-" * 70)
-            print(response.content)
+            await run_agent(agent, tool_map, query, stream=True)
             print("-" * 70)
             print()
             
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, asyncio.CancelledError):
             print("\n\n Thanks for using the Boxing Intelligence Platform!")
             # Show performance summary if observability is available
             if OBSERVABILITY_AVAILABLE:
@@ -387,7 +457,7 @@ async def main():
     
     # Setup platform
     try:
-        client, tools, agent = await setup_boxing_platform()
+        client, tools, tool_map, agent = await setup_boxing_platform()
     except Exception as e:
         print(f"\n❌ Failed to setup platform: {e}")
         print(f"\nDetailed error: {type(e).__name__}")
@@ -407,20 +477,20 @@ async def main():
     print("  2. Interactive mode (ask your own questions)")
     print("  3. Quick test (one multi-server query)")
     
-    choice = input("\nEnter choice (1/2/3) or press Enter for demos: ").strip()
+    choice = (await ainput("\nEnter choice (1/2/3) or press Enter for demos: ")).strip()
     
     if choice == "2":
-        await interactive_mode(agent, tools)
+        await interactive_mode(agent, tool_map)
     elif choice == "3":
-        await demo_multi_server_query(agent, tools)
+        await demo_multi_server_query(agent, tool_map)
         # Show performance summary if observability is available
         if OBSERVABILITY_AVAILABLE:
             monitor = get_monitor()
             monitor.print_summary()
     else:
         # Run both demos
-        await demo_simple_query(agent, tools)
-        await demo_multi_server_query(agent, tools)
+        await demo_simple_query(agent, tool_map)
+        await demo_multi_server_query(agent, tool_map)
         
         # Show performance summary if observability is available
         if OBSERVABILITY_AVAILABLE:
@@ -429,10 +499,13 @@ async def main():
         
         # Offer interactive mode
         print("\n" + "="*70)
-        cont = input("\nWould you like to try interactive mode? (y/n): ").strip().lower()
+        cont = (await ainput("\nWould you like to try interactive mode? (y/n): ")).strip().lower()
         if cont == 'y':
-            await interactive_mode(agent, tools)
+            await interactive_mode(agent, tool_map)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
\ No newline at end of file
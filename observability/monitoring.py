@@ -6,7 +6,7 @@ Provides utilities for monitoring tool calls, latency, and errors.
 """
 
 import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, Tuple
 from datetime import datetime
 
 
@@ -51,6 +51,7 @@ class PerformanceMonitor:
     def __init__(self):
         self.query_count = 0
         self.tool_calls = {}
+        self.speculated_calls = 0
         self.errors = []
         self.start_time = datetime.now()
     
@@ -59,12 +60,34 @@ class PerformanceMonitor:
         self.query_count += 1
         print(f"📝 Query #{self.query_count}: {query[:50]}...")
     
-    def log_tool_call(self, tool_name: str, duration_ms: float):
-        """Log a tool call with duration."""
+    def log_tool_call(self, tool_name: str, duration_ms: float, speculated: bool = False):
+        """Log a tool call with duration; speculated marks a prefetched result."""
         if tool_name not in self.tool_calls:
             self.tool_calls[tool_name] = []
         self.tool_calls[tool_name].append(duration_ms)
-        print(f"⚙️  Tool: {tool_name} ({duration_ms:.0f}ms)")
+        if speculated:
+            self.speculated_calls += 1
+            print(f"⚙️  Tool: {tool_name} ({duration_ms:.0f}ms, prefetched)")
+        else:
+            print(f"⚙️  Tool: {tool_name} ({duration_ms:.0f}ms)")
+    
+    def log_tool_calls_batch(self, calls: Iterable[Tuple]):
+        """
+        Log a turn's tool calls in one go.
+        
+        Args:
+            calls: (tool_name, duration_ms) or (tool_name, duration_ms, speculated) tuples
+        """
+        lines = []
+        for tool_name, duration_ms, *speculated in calls:
+            self.tool_calls.setdefault(tool_name, []).append(duration_ms)
+            if speculated and speculated[0]:
+                self.speculated_calls += 1
+                lines.append(f"⚙️  Tool: {tool_name} ({duration_ms:.0f}ms, prefetched)")
+            else:
+                lines.append(f"⚙️  Tool: {tool_name} ({duration_ms:.0f}ms)")
+        if lines:
+            print("\n".join(lines))
     
     def log_error(self, error: str, context: Dict[str, Any]):
         """Log an error with context."""
@@ -91,6 +114,7 @@ class PerformanceMonitor:
             "runtime_seconds": runtime,
             "total_queries": self.query_count,
             "total_tool_calls": sum(len(v) for v in self.tool_calls.values()),
+            "speculated_tool_calls": self.speculated_calls,
             "tool_breakdown": tool_stats,
             "errors": len(self.errors),
             "queries_per_minute": (self.query_count / runtime * 60) if runtime > 0 else 0
@@ -106,6 +130,8 @@ class PerformanceMonitor:
         print(f"Runtime: {stats['runtime_seconds']:.1f}s")
         print(f"Total Queries: {stats['total_queries']}")
         print(f"Total Tool Calls: {stats['total_tool_calls']}")
+        if stats['speculated_tool_calls']:
+            print(f"Prefetched Tool Calls: {stats['speculated_tool_calls']}")
         print(f"Queries/Min: {stats['queries_per_minute']:.1f}")
         
         if stats['tool_breakdown']: